@@ -1,8 +1,106 @@
 from datetime import datetime, timedelta
 from pathlib import Path
+import mmap
+import os
 import re
+from functools import lru_cache
+from typing import Iterator
 from .log import logger
 
+# Android 日志时间戳，格式: b"10-28 09:27:29.665281"
+# 直接在 mmap 字节上匹配，分组依次为: 月、日、时、分、秒、小数秒
+_TS_RE = re.compile(rb'(\d{2})-(\d{2})\s+(\d{2}):(\d{2}):(\d{2})\.(\d+)')
+
+# 单次过滤中时间戳解析缓存的最大条目数，超出后清空
+_TS_CACHE_LIMIT = 100000
+
+# 标准时间戳 "MM-DD HH:MM:SS.ffffff" 的格式与长度，定宽时可直接按字节串比较
+_TS_KEY_FORMAT = '%m-%d %H:%M:%S.%f'
+_TS_KEY_LEN = 21
+
+# filter_logs 结果缓存的最大条目数
+_RESULT_CACHE_SIZE = 64
+
+
+def parse_log_time(time_match: re.Match, year: int) -> datetime:
+    """
+    # 根据 "MM-DD HH:MM:SS.ffffff" 时间戳的匹配结果构造 datetime，非法日期会抛出 ValueError。
+
+    # 分组依次为月、日、时、分、秒、小数秒，与 _TS_RE 相同；
+    # 字节串（_TS_RE）和字符串模式的匹配结果都可以使用。
+    # 与 strptime 的 %f 一致，小数秒超过 6 位时视为非法时间戳。
+    """
+    # 直接按分组构造 datetime，避免每行调用 strptime 解析格式串
+    month, day, hour, minute, second, frac = time_match.groups()
+    if len(frac) > 6:
+        raise ValueError(f"fractional seconds longer than 6 digits: {frac!r}")
+    # 小数秒按位数补足到微秒，不依赖分组的类型做填充
+    return datetime(
+        year, int(month), int(day),
+        int(hour), int(minute), int(second),
+        int(frac) * 10 ** (6 - len(frac))
+    )
+
+
+def _seek_window_start(mm: mmap.mmap, size: int, start_time: datetime, year: int) -> int:
+    """
+    # 在按时间排序的日志中二分查找时间窗口的起始行。
+
+    # 返回一个行首偏移量，保证该偏移之前带时间戳的行都早于 start_time。
+    # 二分只依据探测到的带时间戳行，该偏移之前的无时间戳行不在扫描范围内。
+    """
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        # 取 mid 之后的第一行
+        line_start = mm.find(b'\n', mid, hi) + 1
+        if line_start <= 0 or line_start >= hi:
+            hi = mid
+            continue
+        # 探测行可能越过 hi，按整行匹配时间戳，避免小数秒被截断后误判为更早的时间
+        line_end = mm.find(b'\n', line_start)
+        
+        time_match = _TS_RE.search(mm, line_start, size if line_end < 0 else line_end)
+        try:
+            is_before = time_match is not None and parse_log_time(time_match, year) < start_time
+        except ValueError:
+            is_before = False
+        
+        if is_before:
+            lo = line_start
+        else:
+            hi = mid
+    return lo
+
+
+def _iter_keyword_spans(mm: mmap.mmap, size: int, keyword: str, pos: int = 0) -> Iterator[tuple[int, int]]:
+    """
+    # 从 pos 开始逐行返回包含关键字的日志行的 (起始, 结束) 偏移（结束位置包含换行符）。
+
+    # 在 mmap 的字节层查找关键字，不包含关键字的行不会被解码和切分。
+    """
+    needle = keyword.encode('utf-8')
+    while pos < size:
+        hit = mm.find(needle, pos)
+        if hit < 0:
+            break
+        # 扩展到命中位置所在的整行
+        start = mm.rfind(b'\n', 0, hit) + 1
+        end = mm.find(b'\n', hit)
+        end = size if end < 0 else end + 1
+        yield start, end
+        pos = end
+
+
+def _decode_line(mm: mmap.mmap, start: int, end: int) -> str:
+    """
+    # 解码 mmap 中的一行日志，CRLF 换行统一为 \n，与文本模式读取的结果一致。
+    """
+    line = mm[start:end].decode('utf-8', errors='replace')
+    if line.endswith('\r\n'):
+        line = line[:-2] + '\n'
+    return line
+
 
 def filter_logs(file_path: str, filter_str: str, timestamp: str, time_window: float = 1.0) -> list[str]:
     """
@@ -14,6 +112,12 @@ def filter_logs(file_path: str, filter_str: str, timestamp: str, time_window: fl
     #   timestamp: 目标时间戳，格式为 "MM-DD HH:MM:SS.ffffff"。
     #   time_window: 以秒为单位的时间窗口（默认为1.0秒），在 timestamp 前后各 time_window/2 的范围内查找。
 
+    # 说明:
+    #   日志需按时间顺序排列（logcat 默认如此），会先二分定位窗口起点，超出窗口终点后停止扫描。
+    #   包含关键字但没有时间戳的行（如 "--------- beginning of main"）只在窗口附近保留：
+    #   位于窗口之前最后一条带时间戳的行与第一条超出窗口终点的关键字行之间的一定返回，
+    #   更早的只有落在二分起点之后才返回，更晚的不返回，避免为收集它们扫描整个文件。
+
     # 返回值:
     #   返回匹配关键字且时间范围符合的日志行列表。
     """
@@ -21,6 +125,32 @@ def filter_logs(file_path: str, filter_str: str, timestamp: str, time_window: fl
     if not Path(file_path).exists():
         raise FileNotFoundError(f"Log file not found: {file_path}")
     
+    # 同一文件常被反复以相同参数过滤，按文件修改时间和大小缓存结果，文件变化后自动失效
+    stat = os.stat(file_path)
+    return list(_filter_logs_cached(
+        file_path, stat.st_mtime_ns, stat.st_size, filter_str, timestamp, time_window
+    ))
+
+
+@lru_cache(maxsize=_RESULT_CACHE_SIZE)
+def _filter_logs_cached(
+    file_path: str,
+    mtime_ns: int,
+    size: int,
+    filter_str: str,
+    timestamp: str,
+    time_window: float
+) -> tuple[str, ...]:
+    """
+    # filter_logs 的缓存层，mtime_ns 和 size 只参与缓存键。
+    """
+    return tuple(_scan_logs(file_path, filter_str, timestamp, time_window))
+
+
+def _scan_logs(file_path: str, filter_str: str, timestamp: str, time_window: float) -> list[str]:
+    """
+    # 扫描日志文件，返回匹配关键字且时间范围符合的日志行，参数同 filter_logs。
+    """
     # 解析目标时间，支持 "MM-DD HH:MM:SS.ffffff" 或 "MM-DD HH:MM:SS" 格式
     try:
         # 检查基本格式
@@ -45,34 +175,75 @@ def filter_logs(file_path: str, filter_str: str, timestamp: str, time_window: fl
     
     logger.info(f"Filtering logs '{filter_str}' in {file_path} from {start_time} to {end_time}")
     
+    # 日志中没有年份，统一使用目标时间的年份（即当前年份）
+    year = target_time.year
+    
+    # 定宽时间戳的字典序与时间顺序一致，窗口不跨年时直接比较字节串，不构造 datetime
+    use_str_keys = start_time.year == end_time.year
+    start_key = start_time.strftime(_TS_KEY_FORMAT).encode('ascii')
+    end_key = end_time.strftime(_TS_KEY_FORMAT).encode('ascii')
+    
+    # 同一微秒常有多行日志，按原始时间串缓存解析结果（非定宽时间戳时使用）
+    ts_cache: dict[bytes, datetime] = {}
+    
     # 读取并过滤日志
     filtered_logs = []
-    with open(file_path, 'r', encoding='utf-8') as file:
-        for line in file:
-            # 1. 首先按关键字过滤
-            if filter_str not in line:
-                continue
-            
-            # 2. 然后按时间范围过滤
-            # 提取时间戳（Android 日志格式）
-            # 格式: "10-28 09:27:29.665281"
-            time_match = re.search(r'(\d{2}-\d{2}\s+)(\d{2}:\d{2}:\d{2}\.\d+)', line)
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            logger.info("Found 0 matching log lines")
+            return filtered_logs
+        
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # logcat 按时间顺序输出，先二分定位到时间窗口起点，跳过之前的内容
+            scan_start = _seek_window_start(mm, size, start_time, year)
             
-            if time_match:
-                try:
+            # 关键字过滤已在字节层完成，这里只处理命中的行；
+            # 时间戳同样直接在 mmap 上匹配，只有最终保留的行才解码
+            for start, end in _iter_keyword_spans(mm, size, filter_str, scan_start):
+                # 按时间范围过滤
+                # 提取时间戳（Android 日志格式）
+                # 格式: "10-28 09:27:29.665281"
+                time_match = _TS_RE.search(mm, start, end)
+                
+                if time_match:
                     time_str = time_match.group(0)
-                    # 解析完整格式 "10-28 09:27:29.665281"
-                    log_time = datetime.strptime(time_str, '%m-%d %H:%M:%S.%f')
-                    log_time = log_time.replace(year=datetime.now().year)
+                    # 长度为 21 且第 5、14 位分别为空格和小数点，说明是标准定宽格式
+                    if (use_str_keys and len(time_str) == _TS_KEY_LEN
+                            and time_str[5:6] == b' ' and time_str[14:15] == b'.'):
+                        if time_str < start_key:
+                            continue
+                        # 字节串比较不校验日期，会保留或结束扫描的行先确认时间合法，
+                        # 非法时间（如 "13-45 25:99:99"）与慢路径一样跳过，不会提前结束扫描
+                        try:
+                            parse_log_time(time_match, year)
+                        except ValueError:
+                            continue
+                        if time_str > end_key:
+                            break
+                        filtered_logs.append(_decode_line(mm, start, end))
+                        continue
+                    
+                    try:
+                        log_time = ts_cache.get(time_str)
+                        if log_time is None:
+                            log_time = parse_log_time(time_match, year)
+                            if len(ts_cache) > _TS_CACHE_LIMIT:
+                                ts_cache.clear()
+                            ts_cache[time_str] = log_time
+                    except ValueError:
+                        # 时间解析失败，跳过此行
+                        continue
+                    
+                    # 已超过时间窗口终点，后续日志不会再落入窗口
+                    if log_time > end_time:
+                        break
                     # 比较完整的日期时间
-                    if start_time <= log_time <= end_time:
-                        filtered_logs.append(line)
-                except ValueError:
-                    # 时间解析失败，跳过此行
-                    continue
-            else:
-                # 没有时间戳但包含关键字，也保留
-                filtered_logs.append(line)
+                    if log_time >= start_time:
+                        filtered_logs.append(_decode_line(mm, start, end))
+                else:
+                    # 没有时间戳但包含关键字，窗口范围内的也保留
+                    filtered_logs.append(_decode_line(mm, start, end))
     
     logger.info(f"Found {len(filtered_logs)} matching log lines")
-    return filtered_logs
\ No newline at end of file
+    return filtered_logs
@@ -0,0 +1,33 @@
+"""
+JSON 序列化
+
+优先使用 orjson，未安装时回退到标准库 json，两种实现输出一致：
+- 输出 UTF-8 字节串，非 ASCII 字符不转义
+- 缩进固定为 2 个空格
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = True) -> bytes:
+    """序列化为 UTF-8 JSON 字节串，默认带缩进"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    解析 JSON 字节串或字符串
+
+    格式错误时抛出 json.JSONDecodeError（orjson.JSONDecodeError 是其子类）。
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
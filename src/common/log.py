@@ -23,15 +23,16 @@ if not logger.handlers:
     console_handler.setLevel(logging.DEBUG)
     
     # 格式化
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
+    log_format = "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s"
+    # 日志文件会跨天追加，保留日期；控制台只显示时分秒，减少时间格式化开销
+    file_handler.setFormatter(logging.Formatter(log_format, datefmt="%Y-%m-%d %H:%M:%S"))
+    console_handler.setFormatter(logging.Formatter(log_format, datefmt="%H:%M:%S"))
     
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
+    
+    # 已有独立的 handler，不再传递给 root logger，避免重复输出
+    logger.propagate = False
 
 # 导出 logger 实例
 __all__ = ["logger"]
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+events 日志文件扫描
+
+搜索目录中文件名包含 'events' 的日志文件，供 search_events_files 工具和工作流的搜索步骤共用：
+- 基于 os.scandir 遍历，DirEntry 自带文件类型，遍历过程中不需要额外的 stat 调用
+- 顶层子目录放到线程中并发遍历，结果顺序与 os.walk 相同
+- 文件大小在遍历结束后批量获取
+"""
+
+import asyncio
+import os
+from typing import Any, Callable, Optional
+
+# 文件名中需要包含的关键字（小写），在文件名转小写后匹配
+EVENTS_TOKEN = "events"
+
+# 匹配文件超过该数量时并发获取文件大小，网络盘/冷缓存下 stat 延迟可以互相重叠
+_PARALLEL_STAT_THRESHOLD = 64
+
+
+def entry_size(entry: os.DirEntry) -> int:
+    """获取文件大小，失效的符号链接返回 0"""
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return 0
+
+
+def path_size(path: str) -> int:
+    """按路径获取文件大小，文件已不存在时返回 0"""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+async def file_sizes(size_func: Callable[[Any], int], items: list) -> list[int]:
+    """
+    批量获取文件大小，全部在线程中执行
+    
+    数量较少时在一个线程中依次获取，较多时逐个并发执行。
+    
+    Args:
+        size_func: 获取单个文件大小的函数，如 entry_size / path_size
+        items: 传给 size_func 的文件条目或路径
+    """
+    if len(items) <= _PARALLEL_STAT_THRESHOLD:
+        return await asyncio.to_thread(lambda: [size_func(item) for item in items])
+    return list(await asyncio.gather(*(asyncio.to_thread(size_func, item) for item in items)))
+
+
+def scan_dir(
+    root: str,
+    dir_mtimes: Optional[dict[str, Optional[int]]] = None
+) -> tuple[list[os.DirEntry], list[str]]:
+    """
+    扫描单层目录，返回文件名包含 'events' 的文件条目和需要继续进入的子目录
+    
+    与 os.walk 一致：不进入指向目录的符号链接，忽略无法读取的目录。
+    
+    Args:
+        root: 目录路径
+        dir_mtimes: 不为 None 时记录目录的 mtime，供调用方缓存扫描结果时校验；
+            mtime 只在成功读取目录后记录，读取失败的目录记为 None
+    """
+    entries = []
+    subdirs = []
+    try:
+        # 先取 mtime 再读目录，扫描过程中发生的变化在下次校验时能够发现
+        mtime = os.stat(root).st_mtime_ns if dir_mtimes is not None else None
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir():
+                    # 目录先行分流，不为目录名做小写转换
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                    continue
+                
+                if EVENTS_TOKEN in entry.name.lower():
+                    entries.append(entry)
+    except OSError:
+        # 读取失败的目录不记录 mtime，记为 None 表示本次结果不完整，调用方不应缓存
+        if dir_mtimes is not None:
+            dir_mtimes[root] = None
+        return entries, []
+    
+    if dir_mtimes is not None:
+        dir_mtimes[root] = mtime
+    return entries, subdirs
+
+
+def _scan(root: str, entries: list[os.DirEntry], dir_mtimes: Optional[dict[str, Optional[int]]]):
+    """递归扫描目录，将文件名包含 'events' 的文件条目追加到 entries"""
+    found, subdirs = scan_dir(root, dir_mtimes)
+    entries.extend(found)
+    # 先记录当前目录的文件，再进入子目录，顺序与 os.walk 相同
+    for subdir in subdirs:
+        _scan(subdir, entries, dir_mtimes)
+
+
+def _scan_subtree(root: str, track_mtimes: bool) -> tuple[list[os.DirEntry], Optional[dict[str, Optional[int]]]]:
+    """扫描整棵子目录树，供线程池中并发执行"""
+    entries = []
+    dir_mtimes = {} if track_mtimes else None
+    _scan(root, entries, dir_mtimes)
+    return entries, dir_mtimes
+
+
+async def scan_events_tree(
+    root: str,
+    dir_mtimes: Optional[dict[str, Optional[int]]] = None
+) -> list[os.DirEntry]:
+    """
+    递归搜索目录中文件名包含 'events' 的文件条目
+    
+    目录遍历是阻塞 IO：先在线程中扫描顶层，再把各个顶层子目录放到线程中并发遍历，
+    重叠各子树的系统调用等待，结果按顶层顺序拼接，与串行遍历一致。
+    
+    Args:
+        root: 目录路径
+        dir_mtimes: 不为 None 时记录遍历到的每个目录的 mtime
+    """
+    entries, subdirs = await asyncio.to_thread(scan_dir, root, dir_mtimes)
+    track_mtimes = dir_mtimes is not None
+    results = await asyncio.gather(*(
+        asyncio.to_thread(_scan_subtree, subdir, track_mtimes) for subdir in subdirs
+    ))
+    for subtree_entries, subtree_mtimes in results:
+        entries.extend(subtree_entries)
+        if track_mtimes:
+            dir_mtimes.update(subtree_mtimes)
+    return entries
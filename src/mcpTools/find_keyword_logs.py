@@ -1,3 +1,4 @@
+import asyncio
 from common.filter_logs import filter_logs
 from common.mcp import mcp
 from common.log import logger
@@ -21,6 +22,7 @@ async def find_keyword_logs(log_file:str, keyword:str, timestamp: str, time_wind
     if not Path(log_file).exists():
         return "Log file not found"
 
-    logs = filter_logs(log_file, keyword, timestamp, time_window)
+    # filter_logs 是同步的文件扫描，放到线程中执行，避免阻塞事件循环
+    logs = await asyncio.to_thread(filter_logs, log_file, keyword, timestamp, time_window)
     logger.info(f"Found {len(logs)} {keyword} log lines")
     return logs
\ No newline at end of file
@@ -1,37 +1,86 @@
 from common.mcp import mcp
+from common.jsonio import loads
 from common.log import logger
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+import asyncio
+import html
 import json
 import os
 
-@mcp.tool()
-async def generate_scene_report(
-    timestamp: str, 
-    time_window: float,
-    log_data: str,
-    log_path: str
-) -> str:
+# 日志片段中不随数据变化的固定部分
+_FILE_SECTION_END = "        </div>\n"
+_CODE_FENCE = "```\n"
+
+# 时间戳转为文件名时的字符替换表，一次 translate 完成全部替换
+_SAFE_TIMESTAMP_TABLE = str.maketrans({":": "-", " ": "_", ".": "-"})
+
+# HTML 报告模板路径
+_TEMPLATE_PATH = Path(__file__).parent / "templates" / "scene_report_template.html"
+
+# 模板中日志部分的占位符，报告按此拆分为头尾两段流式写入
+_LOG_SECTIONS_PLACEHOLDER = "{log_sections}"
+
+# 模板中 <style> 样式块的起止标记，样式块不含占位符，加载时预先展开
+_STYLE_OPEN = "<style>"
+_STYLE_CLOSE = "</style>"
+
+# 写报告文件时的缓冲区大小，合并小块写入以减少系统调用
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# 单个文件日志预览的最大字符数，避免超长日志行撑大报告
+_PREVIEW_MAX_CHARS = 200_000
+
+
+@lru_cache(maxsize=1)
+def _load_template() -> tuple[str, str, str, str]:
     """
-    【步骤3/4】生成场景分析 HTML 报告
+    读取 HTML 报告模板，进程内只读取一次
     
-    基于收集的日志数据生成初步的 HTML 报告框架。
-    AI agent 需要在后续步骤中分析日志并填充分析结论。
+    模板按样式块和日志占位符拆分，体积最大的 CSS 样式块在加载时就还原 {{ }} 转义，
+    每次生成报告时直接写出，不再经过 str.format 扫描。
     
-    Args:
-        timestamp: 分析的目标时间戳，格式为 "MM-DD HH:MM:SS.ffffff"
-        time_window: 时间窗口大小（秒）
-        log_data: 日志数据（JSON格式），包含文件路径和对应的日志内容
-        log_path: 原始日志路径
+    Returns:
+        (样式块之前的模板, 静态样式块, 样式块到日志部分之间的模板, 日志部分之后的模板)
+    """
+    template = _TEMPLATE_PATH.read_text(encoding='utf-8')
+    head, _, tail = template.partition(_LOG_SECTIONS_PLACEHOLDER)
+    prefix, style_open, rest = head.partition(_STYLE_OPEN)
+    css, style_close, body = rest.partition(_STYLE_CLOSE)
+    if not style_close:
+        # 模板没有样式块时整体按普通模板处理
+        return head, "", "", tail
+    return prefix + style_open, css.format(), style_close + body, tail
+
+
+def _preview(logs: list[str], max_lines: int, max_chars: int = _PREVIEW_MAX_CHARS) -> tuple[str, int]:
+    """
+    取日志的前若干行作为预览，同时受行数和字符数限制
     
     Returns:
-        返回生成的 HTML 文件路径和下一步操作说明
+        (预览内容, 实际包含的行数)
     """
-    logger.info(f"[Step 3/4] Generating HTML report for timestamp {timestamp}")
+    buf = []
+    total = 0
+    for line in islice(logs, max_lines):
+        buf.append(line)
+        total += len(line)
+        if total >= max_chars:
+            break
+    return "".join(buf), len(buf)
+
+
+def _build_report(timestamp: str, time_window: float, log_data: str) -> str:
+    """
+    同步生成报告：解析日志数据、渲染并写入 HTML、拼接返回给 AI 的分析提示
     
+    包含 JSON 解析、字符串拼接和文件写入等阻塞操作，由工具函数放到线程中执行。
+    """
     # 解析日志数据
     try:
-        file_logs_map = json.loads(log_data)
+        file_logs_map = loads(log_data)
     except json.JSONDecodeError as e:
         return f"❌ 无法解析日志数据 JSON: {e}"
     
@@ -40,71 +89,75 @@ async def generate_scene_report(
     
     # 统计信息
     total_files = len(file_logs_map)
-    total_logs = sum(len(logs) for logs in file_logs_map.values())
+    # 每个文件的日志条数只计算一次，后续各处直接复用
+    log_counts = {file_path: len(logs) for file_path, logs in file_logs_map.items()}
+    total_logs = sum(log_counts.values())
     
     # 生成 HTML 文件名
     html_output_dir = Path("logs")
     html_output_dir.mkdir(exist_ok=True)
     
-    safe_timestamp = timestamp.replace(":", "-").replace(" ", "_").replace(".", "-")
+    safe_timestamp = timestamp.translate(_SAFE_TIMESTAMP_TABLE)
     html_file = html_output_dir / f"scene_analysis_{safe_timestamp}.html"
     
     # 读取 HTML 模板
-    template_path = Path(__file__).parent / "templates" / "scene_report_template.html"
     try:
-        with open(template_path, 'r', encoding='utf-8') as f:
-            html_template = f.read()
+        template_prefix, template_css, template_body, template_tail = _load_template()
     except FileNotFoundError:
-        return f"❌ HTML 模板文件不存在: {template_path}"
+        return f"❌ HTML 模板文件不存在: {_TEMPLATE_PATH}"
     
-    # 生成日志部分的 HTML
-    log_sections_html = ""
-    for file_path, logs in file_logs_map.items():
-        log_content = "".join(logs[:200])
-        # HTML转义
-        log_content = log_content.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        
-        log_sections_html += f"""
-        <div class="file-section">
-            <h3>📄 {Path(file_path).name}</h3>
-            <p class="meta">共 {len(logs)} 条日志</p>
-            <pre>{log_content}</pre>
-"""
-        if len(logs) > 200:
-            log_sections_html += f"            <p class='meta'>... (省略 {len(logs) - 200} 行) ...</p>\n"
-        log_sections_html += "        </div>\n"
-    
-    # 填充模板
-    html_content = html_template.format(
+    # 流式写入 HTML 文件：头部、各文件日志片段、尾部依次写入，不在内存中拼接整份报告
+    template_fields = dict(
         timestamp=timestamp,
         time_window_half=time_window/2,
         total_files=total_files,
         total_logs=total_logs,
         time_window=time_window,
-        log_sections=log_sections_html
     )
-    
-    # 写入 HTML 文件
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with open(html_file, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+        f.write(template_prefix.format(**template_fields))
+        f.write(template_css)
+        f.write(template_body.format(**template_fields))
+        for file_path, logs in file_logs_map.items():
+            file_name = os.path.basename(file_path)
+            log_count = log_counts[file_path]
+            preview, shown = _preview(logs, 200)
+            # HTML转义（只转义 & < >，与 <pre> 内容所需一致）
+            log_content = html.escape(preview, quote=False)
+            
+            f.write(f"""
+        <div class="file-section">
+            <h3>📄 {file_name}</h3>
+            <p class="meta">共 {log_count} 条日志</p>
+            <pre>{log_content}</pre>
+""")
+            if log_count > shown:
+                f.write(f"            <p class='meta'>... (省略 {log_count - shown} 行) ...</p>\n")
+            f.write(_FILE_SECTION_END)
+        f.write(template_tail.format(**template_fields))
     
     logger.info(f"✅ HTML report generated: {html_file}")
+    # 绝对路径只计算一次，结果中多处复用
+    html_file_abs = str(html_file.absolute())
     
     # 生成日志摘要用于分析
-    log_summary = ""
+    summary_parts: list[str] = []
     for file_path, logs in file_logs_map.items():
-        log_summary += f"\n### 文件: {Path(file_path).name} ({len(logs)} 条)\n"
-        log_summary += "```\n"
-        log_summary += "".join(logs[:50])  # 只显示前50行用于prompt
-        if len(logs) > 50:
-            log_summary += f"\n... (省略 {len(logs) - 50} 行) ...\n"
-        log_summary += "```\n"
+        log_count = log_counts[file_path]
+        summary_parts.append(f"\n### 文件: {os.path.basename(file_path)} ({log_count} 条)\n")
+        summary_parts.append(_CODE_FENCE)
+        preview, shown = _preview(logs, 50)  # 只显示前50行用于prompt
+        summary_parts.append(preview)
+        if log_count > shown:
+            summary_parts.append(f"\n... (省略 {log_count - shown} 行) ...\n")
+        summary_parts.append(_CODE_FENCE)
+    log_summary = "".join(summary_parts)
     
     result = f"""
 ✅ 【步骤3/4完成】HTML 报告已生成
 
 ## 报告信息
-- **文件路径**: `{html_file.absolute()}`
+- **文件路径**: `{html_file_abs}`
 - **分析文件数**: {total_files}
 - **日志条目数**: {total_logs}
 - **时间点**: {timestamp}
@@ -127,7 +180,7 @@ async def generate_scene_report(
 
 ### 更新 HTML 报告
 完成分析后，请使用 `search_replace` 工具更新 HTML 文件：
-- 文件路径: `{html_file.absolute()}`
+- 文件路径: `{html_file_abs}`
 - 将 `<!-- SCENE_ANALYSIS_PLACEHOLDER -->` 替换为完整的场景分析 HTML 内容
 
 ### HTML 模板示例
@@ -164,3 +217,30 @@ async def generate_scene_report(
     
     return result
 
+
+@mcp.tool()
+async def generate_scene_report(
+    timestamp: str, 
+    time_window: float,
+    log_data: str,
+    log_path: str
+) -> str:
+    """
+    【步骤3/4】生成场景分析 HTML 报告
+    
+    基于收集的日志数据生成初步的 HTML 报告框架。
+    AI agent 需要在后续步骤中分析日志并填充分析结论。
+    
+    Args:
+        timestamp: 分析的目标时间戳，格式为 "MM-DD HH:MM:SS.ffffff"
+        time_window: 时间窗口大小（秒）
+        log_data: 日志数据（JSON格式），包含文件路径和对应的日志内容
+        log_path: 原始日志路径
+    
+    Returns:
+        返回生成的 HTML 文件路径和下一步操作说明
+    """
+    logger.info(f"[Step 3/4] Generating HTML report for timestamp {timestamp}")
+    
+    # 报告生成是 CPU/IO 密集型操作，整体放到线程中执行，避免阻塞事件循环
+    return await asyncio.to_thread(_build_report, timestamp, time_window, log_data)
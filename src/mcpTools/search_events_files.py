@@ -1,8 +1,9 @@
 from common.mcp import mcp
+from common.jsonio import dumps
 from common.log import logger
+from common.scan_events import EVENTS_TOKEN, entry_size, file_sizes, scan_events_tree
 from pathlib import Path
 import os
-import json
 
 @mcp.tool()
 async def search_events_files(log_path: str) -> str:
@@ -25,23 +26,23 @@ async def search_events_files(log_path: str) -> str:
     
     if log_path_obj.is_file():
         # 如果是单个文件，检查文件名是否包含 events
-        if 'events' in log_path_obj.name.lower():
+        if EVENTS_TOKEN in log_path_obj.name.lower():
             events_files.append({
                 "path": str(log_path_obj.absolute()),
                 "name": log_path_obj.name,
                 "size": log_path_obj.stat().st_size if log_path_obj.exists() else 0
             })
     elif log_path_obj.is_dir():
-        # 如果是目录，递归搜索包含 events 的文件
-        for root, dirs, files in os.walk(log_path):
-            for file in files:
-                if 'events' in file.lower():
-                    file_path = Path(root) / file
-                    events_files.append({
-                        "path": str(file_path.absolute()),
-                        "name": file,
-                        "size": file_path.stat().st_size if file_path.exists() else 0
-                    })
+        # 如果是目录，递归搜索包含 events 的文件，先只收集条目，再批量获取大小
+        # 遍历和获取大小都在线程中执行，避免阻塞事件循环
+        entries = await scan_events_tree(log_path)
+        sizes = await file_sizes(entry_size, entries)
+        for entry, size in zip(entries, sizes):
+            events_files.append({
+                "path": os.path.abspath(entry.path),
+                "name": entry.name,
+                "size": size
+            })
     else:
         error_msg = f"❌ 路径不存在: {log_path}"
         logger.error(error_msg)
@@ -52,11 +53,14 @@ async def search_events_files(log_path: str) -> str:
     
     logger.info(f"✅ Found {len(events_files)} events files")
     
+    files_list = "\n".join(f"- {f['name']} ({f['size']:,} bytes)" for f in events_files)
+    files_json = dumps(events_files).decode()
+    
     result = f"""
 ✅ 【步骤1/4完成】找到 {len(events_files)} 个 events 文件
 
 ## 文件列表
-{chr(10).join([f"- {f['name']} ({f['size']:,} bytes)" for f in events_files])}
+{files_list}
 
 ## 下一步操作
 请对每个文件调用 `find_keyword_logs` 工具，参数如下：
@@ -66,7 +70,7 @@ async def search_events_files(log_path: str) -> str:
 
 ## 文件路径（JSON格式）
 ```json
-{json.dumps(events_files, ensure_ascii=False, indent=2)}
+{files_json}
 ```
 """
     
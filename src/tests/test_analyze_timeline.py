@@ -0,0 +1,69 @@
+"""
+@author: HarrySunV9x
+@date: 2026-10-14
+@description: AnalyzeTimelineStep 输入读取测试, 包含：
+1. 从提取步骤写入的 file_logs_map 文件读取 (时间, 日志行)
+2. 旧版本 state.json 中内联保存的纯文本 file_logs_map 仍可继续分析
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from workflow.core.state import WorkflowState
+from workflow.steps.analyze_timeline import AnalyzeTimelineStep
+
+LOG_LINES = [
+    "10-28 09:00:01.100000  1  2 I input_focus: com.example.app/.MainActivity\n",
+    "10-28 09:00:02.200000  1  2 I input_focus: com.example.app/.DetailActivity\n",
+    "no time input_focus: com.example.app/.Ignored\n",
+]
+
+
+@pytest.fixture
+def workflow(tmp_path, monkeypatch):
+    """工作流根目录指向临时目录，并创建只包含分析步骤的工作流"""
+    monkeypatch.setattr(WorkflowState, "WORKFLOW_ROOT", tmp_path / "workflows")
+    monkeypatch.setattr(WorkflowState, "_context_cache", {})
+    monkeypatch.setattr(WorkflowState, "_index_cache", {})
+    state = WorkflowState("w1")
+    state.create("scene", {}, ["analyze_timeline"])
+    return state
+
+
+def _timeline() -> list[tuple[str, str]]:
+    """执行分析步骤，返回 (时间, Activity) 列表"""
+    step = AnalyzeTimelineStep("w1")
+    valid, error = step.validate_inputs()
+    assert valid, error
+    output = asyncio.run(step.execute())
+    return [(event["time"], event["activity"]) for event in output["timeline_events"]]
+
+
+class TestAnalyzeTimelineInputs:
+    """分析步骤输入读取测试套件"""
+    
+    def test_read_file_logs_map_path(self, workflow):
+        """测试从 file_logs_map 文件读取提取步骤的输出"""
+        path = workflow.put_large_output("file_logs_map", {
+            "events.txt": [["09:00:01.100000", LOG_LINES[0]], ["09:00:02.200000", LOG_LINES[1]]]
+        })
+        workflow.set_global_data("file_logs_map_path", path)
+        
+        assert _timeline() == [
+            ("09:00:01.100000", ".MainActivity"),
+            ("09:00:02.200000", ".DetailActivity"),
+        ]
+    
+    def test_legacy_inline_file_logs_map(self, workflow):
+        """测试旧版本内联在 global_data 中的纯文本日志行，时间从行中提取，没有时间的行被跳过"""
+        workflow.set_global_data("file_logs_map", {"events.txt": LOG_LINES})
+        
+        assert _timeline() == [
+            ("09:00:01.100000", ".MainActivity"),
+            ("09:00:02.200000", ".DetailActivity"),
+        ]
+        # 读取时生成新的列表，不修改状态中保存的原始数据
+        assert WorkflowState("w1").get_global_data("file_logs_map") == {"events.txt": LOG_LINES}
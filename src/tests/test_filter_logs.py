@@ -6,10 +6,17 @@
 2. 时间戳格式错误（缺少月-日）
 3. 无匹配情况
 4. 文件不存在
+5. 大文件按时间窗口定位
+6. 文件修改后结果缓存失效
+7. 没有时间戳的关键字行只在窗口范围内保留
+8. CRLF 换行的日志返回以 LF 结尾的行
+9. 小数秒超过 6 位的时间戳被跳过
+10. 二分探测行越过查找上界时不误判时间
+11. 时间非法的行不会提前结束窗口扫描
 """
 
 import pytest
-import tempfile
+from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -17,13 +24,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from common.filter_logs import filter_logs
 
 
-class TestFilterLogs:
-    """filter_logs 函数测试套件"""
-    
-    @pytest.fixture
-    def sample_log_file(self):
-        """创建示例日志文件"""
-        content = """	行  504: 10-28 09:27:27.499986  3399  3500 I input_focus: [Focus request 93064f5 NotificationShade,reason=UpdateInputWindows]
+@pytest.fixture(scope="module")
+def sample_log_file(tmp_path_factory):
+    """创建示例日志文件（整个模块共享，只写一次，由 pytest 负责清理）"""
+    content = """	行  504: 10-28 09:27:27.499986  3399  3500 I input_focus: [Focus request 93064f5 NotificationShade,reason=UpdateInputWindows]
 	行  857: 10-28 09:27:32.215816  3399  4570 I input_focus: [Focus leaving 93064f5 NotificationShade,reason=NOT_VISIBLE]
 	行  870: 10-28 09:27:32.287284  3399  3500 I input_focus: [Focus request 67786e8 com.android.launcher/com.android.launcher.Launcher,reason=UpdateInputWindows]
 	行  873: 10-28 09:27:32.298227  3399  4570 I input_focus: [Focus entering 67786e8 com.android.launcher/com.android.launcher.Launcher,reason=setFocusedWindow]
@@ -68,15 +72,14 @@ class TestFilterLogs:
 	行 2275: 10-28 09:28:02.449323  3399  4570 I input_focus: [Focus leaving 20132c7 com.tencent.mm/com.tencent.mm.ui.LauncherUI,reason=Waiting for window because NO_WINDOW]
 	行 2278: 10-28 09:28:02.469377  3399  3500 I input_focus: [Focus request ea05c44 com.oplus.logkit/com.oplus.logkit.collect.activity.CollectActivity,reason=UpdateInputWindows]
 	行 2283: 10-28 09:28:02.500036  3399  4570 I input_focus: [Focus entering ea05c44 com.oplus.logkit/com.oplus.logkit.collect.activity.CollectActivity,reason=Window became focusable. Previous reason: NOT_VISIBLE]"""
-        
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt', encoding='utf-8') as f:
-            f.write(content)
-            temp_path = f.name
-        
-        yield temp_path
-        
-        # 清理
-        Path(temp_path).unlink(missing_ok=True)
+    
+    log_file = tmp_path_factory.mktemp("logs") / "sample_events.txt"
+    log_file.write_text(content, encoding='utf-8')
+    return str(log_file)
+
+
+class TestFilterLogs:
+    """filter_logs 函数测试套件"""
     
     def test_filter_by_keyword(self, sample_log_file):
         """测试关键字过滤"""
@@ -150,6 +153,139 @@ class TestFilterLogs:
             )
         assert f"Log file not found: not_exist.txt"
 
+    def test_filter_large_sorted_log(self, tmp_path):
+        """测试大文件按时间窗口定位（二分查找起点，超出窗口即停止）"""
+        base = datetime(2000, 10, 28, 9, 0, 0)
+        lines = []
+        for i in range(20000):
+            log_time = base + timedelta(milliseconds=10 * i)
+            tag = "input_focus" if i % 2 == 0 else "other_tag"
+            lines.append(f"{log_time:%m-%d %H:%M:%S.%f}  3399  3500 I {tag}: line {i}\n")
+        log_file = tmp_path / "events.txt"
+        log_file.write_text("".join(lines), encoding="utf-8")
+        
+        result = filter_logs(
+            file_path=str(log_file),
+            filter_str="input_focus",
+            timestamp="10-28 09:01:40",
+            time_window=1.0
+        )
+        
+        # 09:01:39.500 ~ 09:01:40.500 共 101 行，其中偶数行为 input_focus
+        assert len(result) == 51
+        assert result[0].startswith("10-28 09:01:39.500000")
+        assert result[-1].startswith("10-28 09:01:40.500000")
+        assert all("input_focus" in line for line in result)
+
+    def test_cache_invalidated_on_change(self, tmp_path):
+        """测试文件修改后结果缓存失效"""
+        log_file = tmp_path / "events.txt"
+        log_file.write_text("10-28 09:27:29.000000  1  2 I input_focus: first\n", encoding="utf-8")
+        
+        first = filter_logs(str(log_file), "input_focus", "10-28 09:27:29", 2.0)
+        assert len(first) == 1
+        
+        # 追加内容会改变文件大小，缓存键随之变化
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("10-28 09:27:29.500000  1  2 I input_focus: second\n")
+        
+        second = filter_logs(str(log_file), "input_focus", "10-28 09:27:29", 2.0)
+        assert len(second) == 2
+        
+        # 返回的是新列表，调用方修改不会影响缓存
+        second.clear()
+        assert len(filter_logs(str(log_file), "input_focus", "10-28 09:27:29", 2.0)) == 2
+
+    def test_untimed_lines_only_kept_near_window(self, tmp_path):
+        """测试窗口内没有时间戳的关键字行被保留，二分跳过的前缀和窗口终点之后的不返回"""
+        base = datetime(2000, 10, 28, 9, 0, 0)
+        lines = ["--------- beginning of main input_focus\n"]
+        for i in range(2000):
+            log_time = base + timedelta(milliseconds=10 * i)
+            lines.append(f"{log_time:%m-%d %H:%M:%S.%f}  3399  3500 I input_focus: line {i}\n")
+            if i == 1000:
+                lines.append("input_focus inside window no ts\n")
+        lines.append("input_focus trailing no ts\n")
+        log_file = tmp_path / "events.txt"
+        log_file.write_text("".join(lines), encoding="utf-8")
+        
+        result = filter_logs(
+            file_path=str(log_file),
+            filter_str="input_focus",
+            timestamp="10-28 09:00:10",
+            time_window=0.01
+        )
+        
+        # 窗口内 09:00:09.995 ~ 09:00:10.005 只有 line 1000 及其后的无时间戳行，首尾两条不返回
+        assert result == [lines[1001], "input_focus inside window no ts\n"]
+
+    def test_crlf_line_endings(self, tmp_path):
+        """测试 CRLF 换行的日志（如 Windows 下的搜索结果）返回以 LF 结尾的行"""
+        log_file = tmp_path / "events.txt"
+        log_file.write_bytes(
+            b"10-28 09:00:30.100000 input_focus crlf\r\n"
+            b"no ts input_focus crlf\r\n"
+            b"10-28 09:00:30.200000 input_focus last"
+        )
+        
+        result = filter_logs(str(log_file), "input_focus", "10-28 09:00:30", 2.0)
+        
+        assert result == [
+            "10-28 09:00:30.100000 input_focus crlf\n",
+            "no ts input_focus crlf\n",
+            "10-28 09:00:30.200000 input_focus last",
+        ]
+
+    def test_bisect_probe_line_crossing_bound(self, tmp_path):
+        """测试二分探测的行越过查找上界时按整行解析时间戳，窗口内的行不被跳过"""
+        log_file = tmp_path / "events.txt"
+        log_file.write_text(
+            "10-28 09:00:00.929383 input_focusxxxxxxxx\n"
+            "10-28 09:00:00.935994 input_focusxxxxx\n"
+            "10-28 09:00:01.001939 input_focusxx\n",
+            encoding="utf-8"
+        )
+        
+        result = filter_logs(str(log_file), "input_focus", "10-28 09:00:00.928836", 0.004)
+        
+        assert result == ["10-28 09:00:00.929383 input_focusxxxxxxxx\n"]
+
+    def test_invalid_timestamp_does_not_end_scan(self, tmp_path):
+        """测试格式匹配但时间非法的行被跳过，不会提前结束窗口扫描"""
+        log_file = tmp_path / "events.txt"
+        log_file.write_text(
+            "10-28 09:00:30.000000 input_focus ok1\n"
+            "13-45 25:99:99.000000 input_focus bad\n"
+            "10-28 09:00:61.000000 input_focus bad2\n"
+            "10-28 09:00:40.000000 input_focus ok2\n",
+            encoding="utf-8"
+        )
+        
+        result = filter_logs(str(log_file), "input_focus", "10-28 09:00:30", 62.0)
+        
+        assert result == [
+            "10-28 09:00:30.000000 input_focus ok1\n",
+            "10-28 09:00:40.000000 input_focus ok2\n",
+        ]
+
+    def test_skip_fraction_longer_than_microseconds(self, tmp_path):
+        """测试小数秒超过 6 位的时间戳与 strptime 一样视为非法，跳过该行"""
+        log_file = tmp_path / "events.txt"
+        log_file.write_text(
+            "10-28 09:00:30.1234567 input_focus seven\n"
+            "10-28 09:00:30.123456789 input_focus nine\n"
+            "10-28 09:00:30.123456 input_focus six\n"
+            "10-28 09:00:30.1 input_focus one\n",
+            encoding="utf-8"
+        )
+        
+        result = filter_logs(str(log_file), "input_focus", "10-28 09:00:30", 2.0)
+        
+        assert result == [
+            "10-28 09:00:30.123456 input_focus six\n",
+            "10-28 09:00:30.1 input_focus one\n",
+        ]
+
 # 单独运行此测试文件
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,87 @@
+"""
+@author: HarrySunV9x
+@date: 2026-10-14
+@description: SearchFilesStep 目录扫描缓存测试, 包含：
+1. 重复搜索命中缓存，结果与首次扫描一致
+2. 嵌套子目录中新增文件后缓存失效
+3. 有目录读取失败时不缓存扫描结果
+"""
+
+import asyncio
+import os
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import scan_events
+from workflow.core.state import WorkflowState
+from workflow.steps import search_files
+from workflow.steps.search_files import SearchFilesStep
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    """创建嵌套的日志目录，工作流根目录指向临时目录，并清空扫描缓存"""
+    monkeypatch.setattr(WorkflowState, "WORKFLOW_ROOT", tmp_path / "workflows")
+    monkeypatch.setattr(WorkflowState, "_context_cache", {})
+    monkeypatch.setattr(WorkflowState, "_index_cache", {})
+    monkeypatch.setattr(search_files, "_scan_cache", {})
+    
+    root = tmp_path / "logs"
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "events_log").write_text("1")
+    (root / "main_log").write_text("2")
+    (root / "a" / "b" / "EVENTS.txt").write_text("33")
+    WorkflowState("w1").create("scene", {"log_path": str(root)}, ["search_files"])
+    return root
+
+
+def _search() -> dict:
+    """执行一次搜索步骤"""
+    return asyncio.run(SearchFilesStep("w1").execute())
+
+
+def _names(result: dict) -> list[str]:
+    """搜索结果中的文件名"""
+    return [f["name"] for f in result["events_files"]]
+
+
+class TestScanCache:
+    """目录扫描缓存测试套件"""
+    
+    def test_repeat_search_hits_cache(self, log_dir):
+        """测试重复搜索命中缓存，结果与首次扫描一致"""
+        first = _search()
+        assert str(log_dir) in search_files._scan_cache
+        
+        assert _search() == first
+        assert _names(first) == ["events_log", "EVENTS.txt"]
+        assert first["total_size"] == 3
+    
+    def test_nested_new_file_invalidates_cache(self, log_dir):
+        """测试嵌套子目录中新增文件后缓存失效"""
+        _search()
+        (log_dir / "a" / "b" / "events_new").write_text("4444")
+        
+        result = _search()
+        assert sorted(_names(result)) == ["EVENTS.txt", "events_log", "events_new"]
+        assert result["total_size"] == 7
+    
+    def test_unreadable_dir_not_cached(self, log_dir, monkeypatch):
+        """测试有目录读取失败时不缓存扫描结果"""
+        blocked = str(log_dir / "a" / "b")
+        real_scandir = os.scandir
+        
+        def flaky_scandir(path):
+            if os.fspath(path) == blocked:
+                raise PermissionError(path)
+            return real_scandir(path)
+        
+        monkeypatch.setattr(scan_events.os, "scandir", flaky_scandir)
+        assert _names(_search()) == ["events_log"]
+        assert str(log_dir) not in search_files._scan_cache
+        
+        # 目录恢复可读后重新扫描，能找到之前漏掉的文件
+        monkeypatch.setattr(scan_events.os, "scandir", real_scandir)
+        assert _names(_search()) == ["events_log", "EVENTS.txt"]
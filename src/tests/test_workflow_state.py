@@ -0,0 +1,225 @@
+"""
+@author: HarrySunV9x
+@date: 2026-10-14
+@description: WorkflowState 工作流索引测试, 包含：
+1. 创建工作流后写入索引
+2. 状态变化后索引以最新记录为准
+3. 索引文件缺失时扫描目录重建
+4. 追加中断留下的残行不影响后续记录
+5. list_workflows 增量解析索引：调用之间追加、重建替换文件、末尾半行
+6. 进程内共享的上下文缓存：跨实例复用与失效、未写盘的修改不外泄
+"""
+
+import pytest
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.jsonio import dumps
+from workflow.core.state import WorkflowState
+
+
+@pytest.fixture
+def workflow_root(tmp_path, monkeypatch):
+    """工作流根目录指向临时目录，并清空进程内缓存"""
+    root = tmp_path / "workflows"
+    monkeypatch.setattr(WorkflowState, "WORKFLOW_ROOT", root)
+    monkeypatch.setattr(WorkflowState, "_context_cache", {})
+    monkeypatch.setattr(WorkflowState, "_index_cache", {})
+    return root
+
+
+def _statuses() -> dict[str, str]:
+    """list_workflows 结果中各工作流的状态"""
+    return {w["workflow_id"]: w["status"] for w in WorkflowState.list_workflows()}
+
+
+class TestWorkflowIndex:
+    """工作流索引测试套件"""
+    
+    def test_create_adds_index_record(self, workflow_root):
+        """测试创建工作流后写入索引"""
+        WorkflowState("a").create("scene", {}, ["s1", "s2"])
+        WorkflowState("b").create("scene", {}, ["s1"])
+        
+        assert (workflow_root / WorkflowState.INDEX_FILENAME).exists()
+        assert _statuses() == {"a": "running", "b": "running"}
+    
+    def test_status_change_updates_index(self, workflow_root):
+        """测试完成或失败后索引以最新记录为准"""
+        WorkflowState("a").create("scene", {}, ["s1"])
+        WorkflowState("b").create("scene", {}, ["s1", "s2"])
+        
+        WorkflowState("a").complete_step("s1")
+        WorkflowState("b").fail_step("s1", "boom")
+        
+        assert _statuses() == {"a": "completed", "b": "failed"}
+    
+    def test_rebuild_when_index_missing(self, workflow_root):
+        """测试索引文件缺失时扫描目录重建"""
+        WorkflowState("a").create("scene", {}, ["s1"])
+        WorkflowState("b").create("scene", {}, ["s1"])
+        WorkflowState("b").complete_step("s1")
+        
+        index_file = workflow_root / WorkflowState.INDEX_FILENAME
+        index_file.unlink()
+        
+        assert _statuses() == {"a": "running", "b": "completed"}
+        assert index_file.exists()
+    
+    def test_torn_line_does_not_swallow_next_record(self, workflow_root):
+        """测试追加中断留下的残行不会与下一条记录粘连"""
+        WorkflowState("a").create("scene", {}, ["s1"])
+        
+        # 模拟写入中断：末尾留下没有换行的半条记录
+        index_file = workflow_root / WorkflowState.INDEX_FILENAME
+        with open(index_file, "ab") as f:
+            f.write(b'{"workflow_id": "a", "sta')
+        
+        WorkflowState("a").complete_step("s1")
+        
+        assert WorkflowState("a").load().status.value == "completed"
+        assert _statuses() == {"a": "completed"}
+
+
+class TestIncrementalIndexCache:
+    """list_workflows 索引增量解析测试套件"""
+    
+    @staticmethod
+    def _cached_offset(workflow_root: Path) -> int:
+        """索引缓存中已解析的字节数"""
+        return WorkflowState._index_cache[str(workflow_root / WorkflowState.INDEX_FILENAME)][1]
+    
+    def test_append_between_calls(self, workflow_root):
+        """测试两次调用之间追加的记录只需解析新增部分"""
+        WorkflowState("a").create("scene", {}, ["s1"])
+        assert _statuses() == {"a": "running"}
+        first_offset = self._cached_offset(workflow_root)
+        
+        WorkflowState("b").create("scene", {}, ["s1"])
+        WorkflowState("a").complete_step("s1")
+        
+        assert _statuses() == {"a": "completed", "b": "running"}
+        index_size = (workflow_root / WorkflowState.INDEX_FILENAME).stat().st_size
+        assert first_offset < self._cached_offset(workflow_root) == index_size
+    
+    def test_rebuild_replaces_index(self, workflow_root):
+        """测试重建索引替换文件后重新全量解析"""
+        WorkflowState("a").create("scene", {}, ["s1"])
+        WorkflowState("b").create("scene", {}, ["s1"])
+        WorkflowState("a").complete_step("s1")
+        assert _statuses() == {"a": "completed", "b": "running"}
+        
+        # 重建后的索引比原来短且是新文件，缓存中的偏移量不再适用
+        index_file = workflow_root / WorkflowState.INDEX_FILENAME
+        old_inode = index_file.stat().st_ino
+        WorkflowState._rebuild_index()
+        assert index_file.stat().st_ino != old_inode
+        
+        WorkflowState("c").create("scene", {}, ["s1"])
+        assert _statuses() == {"a": "completed", "b": "running", "c": "running"}
+    
+    def test_index_replaced_behind_cache(self, workflow_root):
+        """测试索引被其他进程替换（inode 变化）时不沿用旧的偏移量"""
+        WorkflowState("a").create("scene", {}, ["s1"])
+        WorkflowState("b").create("scene", {}, ["s1"])
+        assert _statuses() == {"a": "running", "b": "running"}
+        
+        # 不经过 _rebuild_index，直接用更长的新文件替换，只有 inode 能说明文件已变化
+        index_file = workflow_root / WorkflowState.INDEX_FILENAME
+        records = [
+            {"workflow_id": wid, "type": "scene", "status": "failed", "created_at": "x" * 64}
+            for wid in ("b", "a")
+        ]
+        replacement = workflow_root / "index.tmp"
+        replacement.write_bytes(b"".join(dumps(r, indent=False) + b"\n" for r in records))
+        replacement.replace(index_file)
+        
+        assert _statuses() == {"a": "failed", "b": "failed"}
+    
+    def test_trailing_partial_line_read_next_call(self, workflow_root):
+        """测试末尾尚未写完的半行留到下次调用再解析"""
+        WorkflowState("a").create("scene", {}, ["s1"])
+        WorkflowState("b").create("scene", {}, ["s1"])
+        
+        record = dumps({
+            "workflow_id": "b", "type": "scene", "status": "completed", "created_at": ""
+        }, indent=False)
+        index_file = workflow_root / WorkflowState.INDEX_FILENAME
+        
+        # 写入一半：记录还不完整，不应被解析
+        with open(index_file, "ab") as f:
+            f.write(record[:10])
+        assert _statuses() == {"a": "running", "b": "running"}
+        
+        # 写完剩余部分：下次调用从半行起点继续解析
+        with open(index_file, "ab") as f:
+            f.write(record[10:] + b"\n")
+        assert _statuses() == {"a": "running", "b": "completed"}
+
+
+class TestSharedContextCache:
+    """跨实例共享的上下文缓存测试套件"""
+    
+    def test_unchanged_state_is_shared(self, workflow_root):
+        """测试状态文件未变化时各实例复用同一个已解析的上下文"""
+        WorkflowState("a").create("scene", {}, ["s1", "s2"])
+        
+        assert WorkflowState("a").load() is WorkflowState("a").load()
+    
+    def test_save_invalidates_other_instances(self, workflow_root):
+        """测试一个实例写入后，其他实例读到新状态"""
+        WorkflowState("a").create("scene", {}, ["s1", "s2"])
+        reader = WorkflowState("a")
+        assert reader.load().current_step_index == 0
+        
+        WorkflowState("a").complete_step("s1", output_data={"k": 1})
+        
+        context = reader.load()
+        assert context.current_step_index == 1
+        assert context.global_data == {"k": 1}
+    
+    def test_external_write_invalidates_cache(self, workflow_root):
+        """测试状态文件被外部改写后重新解析"""
+        WorkflowState("a").create("scene", {}, ["s1"])
+        assert WorkflowState("a").load().params == {}
+        
+        state_file = workflow_root / "a" / "state.json"
+        data = state_file.read_text(encoding="utf-8").replace('"params": {}', '"params": {"x": 1}')
+        state_file.write_text(data, encoding="utf-8")
+        
+        assert WorkflowState("a").load().params == {"x": 1}
+    
+    def test_unsaved_start_step_not_shared(self, workflow_root):
+        """测试 start_step(save=False) 的修改只对当前实例可见，未写盘时不影响其他实例"""
+        WorkflowState("a").create("scene", {}, ["s1", "s2"])
+        shared = WorkflowState("a").load()
+        
+        runner = WorkflowState("a")
+        runner.start_step("s1", save=False)
+        assert runner.load().step_results["s1"]["status"] == "running"
+        
+        # 其他实例看到的仍是磁盘上的状态
+        assert "s1" not in WorkflowState("a").load().step_results
+        assert "s1" not in shared.step_results
+        
+        # 步骤被取消、没有写回时，丢弃该实例即可，共享缓存不受影响
+        del runner
+        assert "s1" not in WorkflowState("a").load().step_results
+    
+    def test_start_then_complete_publishes_once_saved(self, workflow_root):
+        """测试 start_step(save=False) 后 complete_step 写盘，其他实例随即可见"""
+        WorkflowState("a").create("scene", {}, ["s1", "s2"])
+        
+        runner = WorkflowState("a")
+        runner.start_step("s1", save=False)
+        runner.complete_step("s1", output_data={"k": 1})
+        
+        context = WorkflowState("a").load()
+        assert context.step_results["s1"]["status"] == "completed"
+        assert context.global_data == {"k": 1}
+
+
+# 单独运行此测试文件
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -11,6 +11,11 @@
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
+import shutil
+
+
+# 流式合并片段文件时的拷贝块大小
+_COPY_CHUNK_SIZE = 64 * 1024
 
 
 class ReportBuilder:
@@ -86,18 +91,7 @@ class ReportBuilder:
             输出文件的绝对路径
         """
         content = "\n".join(self.fragments)
-        custom_styles = "\n".join(self.custom_styles)
-        custom_scripts = "\n".join(self.custom_scripts)
-        
-        html = self._get_template().format(
-            title=self.title,
-            generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            base_styles=self._get_base_styles(),
-            custom_styles=custom_styles,
-            content=content,
-            base_scripts=self._get_base_scripts(),
-            custom_scripts=custom_scripts
-        )
+        html = self._get_template().format(content=content, **self._template_fields())
         
         output = Path(output_path)
         output.parent.mkdir(parents=True, exist_ok=True)
@@ -105,6 +99,64 @@ class ReportBuilder:
         
         return str(output.absolute())
     
+    def build_streaming(self, output_path: str, fragment_paths: list[str]) -> str:
+        """
+        流式生成最终报告
+        
+        与 build 输出相同，但片段文件不读入内存，而是逐个直接拷贝到输出文件。
+        已通过 add_fragment 添加的片段排在片段文件之前，不存在的片段文件会被跳过。
+        
+        Args:
+            output_path: 输出文件路径
+            fragment_paths: 片段文件路径列表（按顺序）
+            
+        Returns:
+            输出文件的绝对路径
+        """
+        head_template, _, tail_template = self._get_template().partition("{content}")
+        fields = self._template_fields()
+        
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        
+        # 与 build 的 write_text、片段的 read_text 一样使用文本模式，换行符的转换方式保持一致
+        with open(output, "w", encoding="utf-8") as dst:
+            dst.write(head_template.format(**fields))
+            
+            # 片段之间以换行分隔，与 build 中的 "\n".join 一致
+            first = True
+            for fragment in self.fragments:
+                if not first:
+                    dst.write("\n")
+                dst.write(fragment)
+                first = False
+            
+            for fragment_path in fragment_paths:
+                try:
+                    src = open(fragment_path, "r", encoding="utf-8")
+                except FileNotFoundError:
+                    continue
+                with src:
+                    if not first:
+                        dst.write("\n")
+                    shutil.copyfileobj(src, dst, _COPY_CHUNK_SIZE)
+                    first = False
+            
+            dst.write(tail_template.format(**fields))
+        
+        return str(output.absolute())
+    
+    def _template_fields(self) -> dict[str, str]:
+        """模板中除正文 content 以外的字段，build 和 build_streaming 共用"""
+        return dict(
+            title=self.title,
+            generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            base_styles=self._get_base_styles(),
+            custom_styles="\n".join(self.custom_styles),
+            base_scripts=self._get_base_scripts(),
+            custom_scripts="\n".join(self.custom_scripts)
+        )
+    
     def _get_template(self) -> str:
         """获取 HTML 模板"""
         return """<!DOCTYPE html>
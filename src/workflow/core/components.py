@@ -9,10 +9,41 @@ HTML 组件库 - 提供所有报告需要的 HTML 组件
 
 from typing import Optional
 from dataclasses import dataclass
+from functools import lru_cache
 import html
+import re
 
 
-@dataclass
+# 转义结果缓存大小：报告中包名、Activity、表头等字符串大量重复，缓存命中率很高
+_ESCAPE_CACHE_SIZE = 4096
+
+# 只缓存不超过该长度的文本；日志块等长文本几乎不会重复出现，缓存只会长期占用内存
+_ESCAPE_CACHE_MAX_LEN = 256
+
+# 需要转义的字符，不含这些字符的文本（时间戳、包名等大多数情况）可原样返回
+_NEEDS_ESCAPE_RE = re.compile(r'[&<>"\']')
+
+# 结论框各类型对应的图标
+_BOX_ICONS = {
+    "info": "💡",
+    "success": "✅",
+    "warning": "⚠️",
+    "error": "❌"
+}
+
+
+def _escape_text(text: str) -> str:
+    """HTML 转义，不含特殊字符的文本原样返回"""
+    if _NEEDS_ESCAPE_RE.search(text) is None:
+        return text
+    return html.escape(text)
+
+
+# 带缓存的 HTML 转义，只用于短文本
+_escape_cached = lru_cache(maxsize=_ESCAPE_CACHE_SIZE)(_escape_text)
+
+
+@dataclass(slots=True)
 class TimelineEvent:
     """时间线事件"""
     time: str
@@ -22,7 +53,7 @@ class TimelineEvent:
     highlight: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class StatCard:
     """统计卡片"""
     value: str
@@ -31,7 +62,7 @@ class StatCard:
     color: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class TableRow:
     """表格行"""
     cells: list[str]
@@ -49,8 +80,14 @@ class HTMLComponents:
     
     @staticmethod
     def escape(text: str) -> str:
-        """HTML 转义"""
-        return html.escape(str(text))
+        """HTML 转义，短文本的结果会被缓存"""
+        # str 的子类（如继承 str 的 Enum）同样先 str()，与 html.escape(str(text)) 一致；
+        # 缓存只接收精确的 str，相等的子类实例不会与普通字符串共用缓存项
+        if type(text) is not str:
+            text = str(text)
+        if len(text) <= _ESCAPE_CACHE_MAX_LEN:
+            return _escape_cached(text)
+        return _escape_text(text)
     
     # ==================== 布局组件 ====================
     
@@ -98,17 +135,17 @@ class HTMLComponents:
             timestamp: 时间戳
             extra_info: 额外信息 {"label": "value"}
         """
-        meta_items = []
-        if timestamp:
-            meta_items.append(f'<span class="meta-item">🕐 {HTMLComponents.escape(timestamp)}</span>')
-        
+        timestamp_html = f'<span class="meta-item">🕐 {HTMLComponents.escape(timestamp)}</span>' if timestamp else ""
         if extra_info:
+            # 只有存在额外信息时才需要拼接多个元信息项
+            meta_items = [timestamp_html] if timestamp_html else []
             for label, value in extra_info.items():
                 meta_items.append(
                     f'<span class="meta-item">{HTMLComponents.escape(label)}: {HTMLComponents.escape(value)}</span>'
                 )
-        
-        meta_html = " | ".join(meta_items) if meta_items else ""
+            meta_html = " | ".join(meta_items)
+        else:
+            meta_html = timestamp_html
         subtitle_html = f'<p class="header-subtitle">{HTMLComponents.escape(subtitle)}</p>' if subtitle else ""
         
         return f"""
@@ -129,20 +166,21 @@ class HTMLComponents:
         Args:
             stats: StatCard 列表
         """
-        cards_html = ""
+        escape = HTMLComponents.escape
+        cards: list[str] = []
         for stat in stats:
             icon_html = f'<span class="stat-icon">{stat.icon}</span>' if stat.icon else ""
             style = f'style="--card-color: {stat.color};"' if stat.color else ""
             
-            cards_html += f"""
+            cards.append(f"""
         <div class="stat-card" {style}>
             {icon_html}
-            <div class="stat-value">{HTMLComponents.escape(stat.value)}</div>
-            <div class="stat-label">{HTMLComponents.escape(stat.label)}</div>
+            <div class="stat-value">{escape(stat.value)}</div>
+            <div class="stat-label">{escape(stat.label)}</div>
         </div>
-"""
+""")
         
-        return f'<div class="stats-grid">{cards_html}</div>'
+        return f'<div class="stats-grid">{"".join(cards)}</div>'
     
     @staticmethod
     def table(
@@ -163,17 +201,18 @@ class HTMLComponents:
         caption_html = f"<caption>{HTMLComponents.escape(caption)}</caption>" if caption else ""
         sortable_class = "sortable" if sortable else ""
         
-        th_html = "".join([
+        th_html = "".join(
             f'<th>{HTMLComponents.escape(h)}</th>' for h in headers
-        ])
+        )
         
-        tr_html = ""
+        tr_parts: list[str] = []
         for row in rows:
             row_class = "highlight" if row.highlight else ""
-            td_html = "".join([
+            td_html = "".join(
                 f'<td>{HTMLComponents.escape(cell)}</td>' for cell in row.cells
-            ])
-            tr_html += f'<tr class="{row_class}">{td_html}</tr>\n'
+            )
+            tr_parts.append(f'<tr class="{row_class}">{td_html}</tr>\n')
+        tr_html = "".join(tr_parts)
         
         return f"""
 <table class="data-table {sortable_class}">
@@ -199,22 +238,22 @@ class HTMLComponents:
         """
         title_html = f'<h3 class="timeline-title">{HTMLComponents.escape(title)}</h3>' if title else ""
         
-        items_html = ""
+        items: list[str] = []
         for event in events:
             highlight_class = "timeline-item--highlight" if event.highlight else ""
             icon = event.icon or "●"
             desc_html = f'<p class="timeline-desc">{HTMLComponents.escape(event.description)}</p>' if event.description else ""
             
-            items_html += f"""
-        <div class="timeline-item {highlight_class}">
-            <div class="timeline-marker">{icon}</div>
-            <div class="timeline-time">{HTMLComponents.escape(event.time)}</div>
-            <div class="timeline-content">
-                <h4 class="timeline-event-title">{HTMLComponents.escape(event.title)}</h4>
-                {desc_html}
-            </div>
-        </div>
-"""
+            # 单个条目会重复上百次，片段写成紧凑的单行，减少输出体积和拷贝
+            items.append(
+                f'<div class="timeline-item {highlight_class}">'
+                f'<div class="timeline-marker">{icon}</div>'
+                f'<div class="timeline-time">{HTMLComponents.escape(event.time)}</div>'
+                f'<div class="timeline-content">'
+                f'<h4 class="timeline-event-title">{HTMLComponents.escape(event.title)}</h4>'
+                f'{desc_html}</div></div>\n'
+            )
+        items_html = "".join(items)
         
         return f"""
 <div class="timeline-vertical">
@@ -239,24 +278,27 @@ class HTMLComponents:
         """
         title_html = f'<h3 class="timeline-title">{HTMLComponents.escape(title)}</h3>' if title else ""
         
-        segments_html = ""
+        escape = HTMLComponents.escape
+        # 循环外只做一次除法；没有事件时总时长可能为 0，此时不做除法
+        percent_per_ms = 100 / total_duration if total_duration > 0 else 0
+        segments: list[str] = []
         for event in events:
-            width_percent = (event["duration"] / total_duration) * 100
-            left_percent = (event.get("start", 0) / total_duration) * 100
+            duration = event["duration"]
+            name = escape(event["name"])  # 名称在一个片段中出现三次，只转义一次
+            width_percent = duration * percent_per_ms
+            left_percent = event.get("start", 0) * percent_per_ms
             color = event.get("color", "#6366f1")
             
-            segments_html += f"""
-        <div class="timeline-segment" 
-             style="left: {left_percent}%; width: {width_percent}%; background-color: {color};"
-             data-name="{HTMLComponents.escape(event['name'])}"
-             data-duration="{event['duration']}ms">
-            <span class="segment-label">{HTMLComponents.escape(event['name'])}</span>
-            <div class="segment-tooltip">
-                <strong>{HTMLComponents.escape(event['name'])}</strong><br>
-                耗时: {event['duration']}ms
-            </div>
-        </div>
-"""
+            segments.append(
+                f'<div class="timeline-segment" '
+                f'style="left:{left_percent}%;width:{width_percent}%;background-color:{color};" '
+                f'data-name="{name}" data-duration="{duration}ms">'
+                f'<span class="segment-label">{name}</span>'
+                f'<div class="segment-tooltip">'
+                f'<strong>{name}</strong><br>'
+                f'耗时: {duration}ms</div></div>\n'
+            )
+        segments_html = "".join(segments)
         
         return f"""
 <div class="timeline-horizontal">
@@ -287,13 +329,7 @@ class HTMLComponents:
             content: 内容（支持 HTML）
             box_type: 类型 info/success/warning/error
         """
-        icons = {
-            "info": "💡",
-            "success": "✅",
-            "warning": "⚠️",
-            "error": "❌"
-        }
-        icon = icons.get(box_type, "📌")
+        icon = _BOX_ICONS.get(box_type, "📌")
         
         return f"""
 <div class="conclusion-box conclusion-box--{box_type}">
@@ -356,14 +392,14 @@ class HTMLComponents:
         """
         title_html = f'<h4 class="kv-title">{HTMLComponents.escape(title)}</h4>' if title else ""
         
-        items_html = ""
-        for key, value in items.items():
-            items_html += f"""
-        <div class="kv-item">
-            <span class="kv-key">{HTMLComponents.escape(key)}</span>
-            <span class="kv-value">{HTMLComponents.escape(str(value))}</span>
-        </div>
-"""
+        escape = HTMLComponents.escape
+        items_html = "".join(
+            f'<div class="kv-item">'
+            f'<span class="kv-key">{escape(key)}</span>'
+            f'<span class="kv-value">{escape(value)}</span>'
+            f'</div>\n'
+            for key, value in items.items()
+        )
         
         return f"""
 <div class="kv-list">
@@ -382,9 +418,9 @@ class HTMLComponents:
             title: 列表标题
         """
         title_html = f'<h4 class="tags-title">{HTMLComponents.escape(title)}</h4>' if title else ""
-        tags_html = "".join([
+        tags_html = "".join(
             f'<span class="tag">{HTMLComponents.escape(tag)}</span>' for tag in tags
-        ])
+        )
         
         return f"""
 <div class="tag-list">
@@ -401,22 +437,22 @@ class HTMLComponents:
         Args:
             activities: [{"package": "com.xxx", "activity": "MainActivity", "time": "09:27:29"}]
         """
-        items_html = ""
+        escape = HTMLComponents.escape
+        last_index = len(activities) - 1
+        items: list[str] = []
         for i, activity in enumerate(activities):
-            arrow = '<div class="flow-arrow">→</div>' if i < len(activities) - 1 else ""
+            arrow = '<div class="flow-arrow">→</div>' if i < last_index else ""
             
-            items_html += f"""
-        <div class="flow-item">
-            <div class="flow-time">{HTMLComponents.escape(activity.get('time', ''))}</div>
-            <div class="flow-box">
-                <div class="flow-package">{HTMLComponents.escape(activity.get('package', ''))}</div>
-                <div class="flow-activity">{HTMLComponents.escape(activity.get('activity', ''))}</div>
-            </div>
-        </div>
-        {arrow}
-"""
+            items.append(
+                f'<div class="flow-item">'
+                f'<div class="flow-time">{escape(activity.get("time", ""))}</div>'
+                f'<div class="flow-box">'
+                f'<div class="flow-package">{escape(activity.get("package", ""))}</div>'
+                f'<div class="flow-activity">{escape(activity.get("activity", ""))}</div>'
+                f'</div></div>{arrow}\n'
+            )
         
-        return f'<div class="activity-flow">{items_html}</div>'
+        return f'<div class="activity-flow">{"".join(items)}</div>'
     
     # ==================== 占位符组件 ====================
     
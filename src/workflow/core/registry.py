@@ -10,6 +10,7 @@
 from dataclasses import dataclass, field
 from typing import Callable, Optional, Any
 from enum import Enum
+from operator import attrgetter
 
 
 class StepType(str, Enum):
@@ -23,7 +24,7 @@ class StepType(str, Enum):
     FINALIZE = "finalize"   # 最终化步骤
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StepDefinition:
     """
     步骤定义
@@ -52,7 +53,7 @@ class StepDefinition:
     config: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WorkflowDefinition:
     """
     工作流定义
@@ -83,6 +84,11 @@ class StepRegistry:
             cls._instance = super().__new__(cls)
             cls._instance._steps: dict[str, StepDefinition] = {}
             cls._instance._workflows: dict[str, WorkflowDefinition] = {}
+            # 工作流步骤解析结果缓存，注册新定义时清空
+            cls._instance._workflow_steps_cache: dict[str, list[StepDefinition]] = {}
+            # 帮助信息缓存，定义不变时帮助文本也不变，注册新定义时清空
+            cls._instance._step_help_cache: dict[str, str] = {}
+            cls._instance._workflow_help_cache: dict[str, str] = {}
             cls._instance._init_default_definitions()
         return cls._instance
     
@@ -120,7 +126,7 @@ class StepRegistry:
             step_type=StepType.EXTRACT,
             mcp_tool_name="extract_logs",
             inputs=["events_files", "timestamp", "time_window"],
-            outputs=["file_logs_map", "total_logs", "files_with_logs"],
+            outputs=["file_logs_map_path", "total_logs", "files_with_logs"],
             order=3
         ))
         
@@ -130,7 +136,7 @@ class StepRegistry:
             description="解析日志生成时间线数据",
             step_type=StepType.ANALYZE,
             mcp_tool_name="analyze_timeline",
-            inputs=["file_logs_map"],
+            inputs=["file_logs_map_path"],
             outputs=["timeline_events", "activity_flow"],
             order=4
         ))
@@ -141,7 +147,7 @@ class StepRegistry:
             description="AI 分析日志并生成场景分析",
             step_type=StepType.ANALYZE,
             mcp_tool_name="generate_analysis",
-            inputs=["file_logs_map", "timeline_events"],
+            inputs=["file_logs_map_path", "timeline_events"],
             outputs=["analysis_html"],
             order=5
         ))
@@ -194,10 +200,18 @@ class StepRegistry:
     def register_step(self, step: StepDefinition):
         """注册步骤"""
         self._steps[step.name] = step
+        self._clear_caches()
     
     def register_workflow(self, workflow: WorkflowDefinition):
         """注册工作流"""
         self._workflows[workflow.name] = workflow
+        self._clear_caches()
+    
+    def _clear_caches(self):
+        """清空由定义派生的缓存"""
+        self._workflow_steps_cache.clear()
+        self._step_help_cache.clear()
+        self._workflow_help_cache.clear()
     
     def get_step(self, name: str) -> Optional[StepDefinition]:
         """获取步骤定义"""
@@ -208,7 +222,15 @@ class StepRegistry:
         return self._workflows.get(name)
     
     def get_workflow_steps(self, workflow_name: str) -> list[StepDefinition]:
-        """获取工作流的所有步骤定义（按顺序）"""
+        """
+        获取工作流的所有步骤定义（按顺序）
+        
+        结果按工作流名缓存，返回的列表为共享对象，调用方不应修改
+        """
+        cached = self._workflow_steps_cache.get(workflow_name)
+        if cached is not None:
+            return cached
+        
         workflow = self.get_workflow(workflow_name)
         if not workflow:
             return []
@@ -219,11 +241,12 @@ class StepRegistry:
             if step:
                 steps.append(step)
         
+        self._workflow_steps_cache[workflow_name] = steps
         return steps
     
     def list_steps(self) -> list[StepDefinition]:
         """列出所有步骤"""
-        return sorted(self._steps.values(), key=lambda s: s.order)
+        return sorted(self._steps.values(), key=attrgetter("order"))
     
     def list_workflows(self) -> list[WorkflowDefinition]:
         """列出所有工作流"""
@@ -231,11 +254,15 @@ class StepRegistry:
     
     def get_step_help(self, step_name: str) -> str:
         """获取步骤帮助信息"""
+        cached = self._step_help_cache.get(step_name)
+        if cached is not None:
+            return cached
+        
         step = self.get_step(step_name)
         if not step:
             return f"步骤 {step_name} 不存在"
         
-        return f"""
+        help_md = f"""
 **{step.display_name}** (`{step.name}`)
 
 {step.description}
@@ -246,9 +273,15 @@ class StepRegistry:
 - **输出**: {', '.join(step.outputs) or '无'}
 - **生成 HTML**: {'是' if step.generates_html else '否'}
 """
+        self._step_help_cache[step_name] = help_md
+        return help_md
     
     def get_workflow_help(self, workflow_name: str) -> str:
         """获取工作流帮助信息"""
+        cached = self._workflow_help_cache.get(workflow_name)
+        if cached is not None:
+            return cached
+        
         workflow = self.get_workflow(workflow_name)
         if not workflow:
             return f"工作流 {workflow_name} 不存在"
@@ -265,7 +298,7 @@ class StepRegistry:
             default = f"，默认: {param_def.get('default')}" if param_def.get("default") is not None else ""
             params_info.append(f"- `{param_name}` ({required}{default}): {param_def.get('description', '')}")
         
-        return f"""
+        help_md = f"""
 ## {workflow.display_name}
 
 {workflow.description}
@@ -276,6 +309,8 @@ class StepRegistry:
 ### 步骤
 {chr(10).join(steps_info)}
 """
+        self._workflow_help_cache[workflow_name] = help_md
+        return help_md
 
 
 # 全局单例
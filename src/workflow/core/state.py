@@ -9,11 +9,19 @@
 """
 
 from pathlib import Path
-import json
+import os
 from datetime import datetime
 from typing import Optional, Any
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from common.jsonio import dumps, loads
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """先写临时文件再 os.replace 替换，写入中断时不会留下损坏的半截文件"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
 
 
 class WorkflowStatus(str, Enum):
@@ -75,8 +83,13 @@ class WorkflowContext:
     output_path: Optional[str] = None
     
     def to_dict(self) -> dict:
-        """转换为字典"""
-        data = asdict(self)
+        """
+        转换为字典
+        
+        只做浅拷贝：字段本身已是普通 dict / list，无需 asdict 递归深拷贝，
+        返回的嵌套对象与上下文共享，仅用于序列化。
+        """
+        data = self.__dict__.copy()
         data["status"] = self.status.value
         return data
     
@@ -105,17 +118,38 @@ class WorkflowState:
         │   ├── 01_header.html
         │   ├── 02_stats.html
         │   └── ...
+        ├── outputs/            # 体积较大的步骤输出（如 file_logs_map）
         └── report.html         # 最终报告
+    logs/workflows/index.ndjson # 工作流索引，供 list_workflows 使用
     """
     
     # 工作流根目录
     WORKFLOW_ROOT = Path("logs/workflows")
     
+    # 工作流索引文件名（位于根目录下），每行一条工作流摘要，后写入的记录覆盖先前的
+    INDEX_FILENAME = "index.ndjson"
+    
+    # 已加载的上下文缓存，进程内所有实例共享：状态文件路径 -> ((mtime_ns, size), 上下文)
+    # 每次工具调用都会新建 WorkflowState，共享缓存使同一工作流的状态文件只在变化后才重新解析
+    _context_cache: dict[str, tuple[tuple[int, int], "WorkflowContext"]] = {}
+    
+    # 上下文缓存的工作流数量上限，超出时淘汰最久未使用的
+    _CONTEXT_CACHE_MAX = 128
+    
+    # 已解析的索引缓存：索引文件路径 -> (inode, 已解析的字节数, {workflow_id: 最新摘要})
+    # 索引只追加写入，再次读取时只解析新增的行；重建索引会替换文件（inode 改变），此时全量重新解析
+    _index_cache: dict[str, tuple[int, int, dict[str, dict]]] = {}
+    
     def __init__(self, workflow_id: str):
         self.workflow_id = workflow_id
         self.workflow_dir = self.WORKFLOW_ROOT / workflow_id
         self.state_file = self.workflow_dir / "state.json"
         self.fragments_dir = self.workflow_dir / "fragments"
+        self.outputs_dir = self.workflow_dir / "outputs"
+        self._cache_key = str(self.state_file)
+        
+        # start_step(save=False) 产生的尚未写盘的上下文，只对当前实例可见，_save 后清空
+        self._pending_context: Optional[WorkflowContext] = None
         
     def exists(self) -> bool:
         """检查工作流是否存在"""
@@ -156,15 +190,43 @@ class WorkflowState:
         )
         
         self._save(context)
+        self._append_index(context)
         return context
     
     def load(self) -> Optional[WorkflowContext]:
-        """加载现有工作流状态"""
-        if not self.state_file.exists():
+        """
+        加载现有工作流状态
+        
+        状态文件未变化时直接返回内存中的上下文，不重复读取和解析。
+        返回的上下文在进程内的所有实例间共享，修改后需通过 _save 写回。
+        当前实例有尚未写盘的上下文时优先返回它。
+        """
+        if self._pending_context is not None:
+            return self._pending_context
+        
+        try:
+            st = self.state_file.stat()
+        except FileNotFoundError:
+            self._context_cache.pop(self._cache_key, None)
             return None
         
-        data = json.loads(self.state_file.read_text(encoding="utf-8"))
-        return WorkflowContext.from_dict(data)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        cached = self._context_cache.get(self._cache_key)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        
+        data = loads(self.state_file.read_bytes())
+        context = WorkflowContext.from_dict(data)
+        self._cache_context(stat_key, context)
+        return context
+    
+    def _cache_context(self, stat_key: tuple[int, int], context: WorkflowContext):
+        """记录与状态文件 stat 对应的上下文，重新插入以维持最近使用顺序"""
+        cache = self._context_cache
+        cache.pop(self._cache_key, None)
+        if len(cache) >= self._CONTEXT_CACHE_MAX:
+            del cache[next(iter(cache))]
+        cache[self._cache_key] = (stat_key, context)
     
     def get_current_step(self) -> Optional[str]:
         """获取当前待执行的步骤"""
@@ -203,12 +265,40 @@ class WorkflowState:
             return context.global_data.get(key, default)
         return default
     
-    def start_step(self, step_name: str) -> WorkflowContext:
+    def put_large_output(self, key: str, value: Any) -> str:
+        """
+        将体积较大的输出数据写入单独的文件
+        
+        大数据不合并进 global_data，state.json 中只保存返回的文件路径，
+        避免之后每次 load / _save 都重复解析和序列化这部分数据。
+        
+        Args:
+            key: 数据键，用作文件名
+            value: 可 JSON 序列化的数据
+            
+        Returns:
+            数据文件路径
+        """
+        self.outputs_dir.mkdir(parents=True, exist_ok=True)
+        output_file = self.outputs_dir / f"{key}.json"
+        _atomic_write_bytes(output_file, dumps(value, indent=False))
+        return str(output_file)
+    
+    def load_large_output(self, path: str, default: Any = None) -> Any:
+        """读取 put_large_output 写入的数据，文件不存在时返回默认值"""
+        try:
+            return loads(Path(path).read_bytes())
+        except FileNotFoundError:
+            return default
+    
+    def start_step(self, step_name: str, save: bool = True) -> WorkflowContext:
         """
         标记步骤开始执行
         
         Args:
             step_name: 步骤名称
+            save: 是否立即写入状态文件。为 False 时只更新当前实例内存中的上下文副本，
+                  随后的 complete_step / fail_step 会一并写入，每个步骤只序列化一次
             
         Returns:
             更新后的工作流上下文
@@ -217,17 +307,28 @@ class WorkflowState:
         if not context:
             raise ValueError(f"Workflow {self.workflow_id} not found")
         
-        result = StepResult(
-            step_name=step_name,
-            status=StepStatus.RUNNING,
-            started_at=datetime.now().isoformat()
-        )
+        now = datetime.now().isoformat()
         
-        context.step_results[step_name] = asdict(result)
-        context.step_results[step_name]["status"] = result.status.value
-        context.updated_at = datetime.now().isoformat()
+        if not save:
+            # 暂不写盘的修改在副本上进行：其他实例读到的共享上下文始终与文件一致，
+            # 步骤被取消（CancelledError）等未能写回时，副本随实例一起丢弃
+            context = replace(context, step_results=dict(context.step_results))
+            self._pending_context = context
         
-        self._save(context)
+        # 直接按 StepResult 的字段构造字典，省去 asdict 的递归拷贝
+        context.step_results[step_name] = {
+            "step_name": step_name,
+            "status": StepStatus.RUNNING.value,
+            "started_at": now,
+            "completed_at": None,
+            "output_data": {},
+            "html_fragment_path": None,
+            "error": None
+        }
+        context.updated_at = now
+        
+        if save:
+            self._save(context)
         return context
     
     def complete_step(
@@ -253,6 +354,14 @@ class WorkflowState:
         
         now = datetime.now().isoformat()
         
+        # 先写 HTML 片段，写入失败时上下文（可能是内存缓存）尚未被修改
+        fragment_path = None
+        if html_fragment:
+            fragment_index = len(context.html_fragments) + 1
+            fragment_filename = f"{fragment_index:02d}_{step_name}.html"
+            fragment_path = self.fragments_dir / fragment_filename
+            fragment_path.write_text(html_fragment, encoding="utf-8")
+        
         # 更新步骤结果
         step_result = context.step_results.get(step_name, {
             "step_name": step_name,
@@ -264,13 +373,8 @@ class WorkflowState:
         step_result["completed_at"] = now
         step_result["output_data"] = output_data or {}
         
-        # 保存 HTML 片段
-        if html_fragment:
-            fragment_index = len(context.html_fragments) + 1
-            fragment_filename = f"{fragment_index:02d}_{step_name}.html"
-            fragment_path = self.fragments_dir / fragment_filename
-            fragment_path.write_text(html_fragment, encoding="utf-8")
-            
+        # 记录 HTML 片段
+        if fragment_path:
             step_result["html_fragment_path"] = str(fragment_path)
             context.html_fragments.append(str(fragment_path))
         
@@ -285,10 +389,13 @@ class WorkflowState:
         context.updated_at = now
         
         # 检查是否完成所有步骤
-        if context.current_step_index >= len(context.steps):
+        finished = context.current_step_index >= len(context.steps)
+        if finished:
             context.status = WorkflowStatus.COMPLETED
         
         self._save(context)
+        if finished:
+            self._append_index(context)
         return context
     
     def fail_step(self, step_name: str, error: str) -> WorkflowContext:
@@ -313,6 +420,7 @@ class WorkflowState:
         context.updated_at = now
         
         self._save(context)
+        self._append_index(context)
         return context
     
     def get_next_step_info(self) -> dict:
@@ -368,21 +476,50 @@ class WorkflowState:
     
     def _save(self, context: WorkflowContext):
         """保存状态到文件"""
-        self.state_file.write_text(
-            json.dumps(context.to_dict(), ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
+        self._pending_context = None
+        try:
+            _atomic_write_bytes(self.state_file, dumps(context.to_dict()))
+        except Exception:
+            # 写入失败时内存中的上下文已与文件不一致，丢弃缓存，下次从文件重新加载
+            self._context_cache.pop(self._cache_key, None)
+            raise
+        st = self.state_file.stat()
+        self._cache_context((st.st_mtime_ns, st.st_size), context)
+    
+    def _append_index(self, context: WorkflowContext):
+        """工作流创建或状态变化时，向索引追加一条摘要记录"""
+        index_file = self.WORKFLOW_ROOT / self.INDEX_FILENAME
+        if not index_file.exists():
+            # 首次使用索引时扫描一次已有工作流，当前工作流已写入 state.json，会包含在内
+            self._rebuild_index()
+            return
+        
+        summary = {
+            "workflow_id": context.workflow_id,
+            "type": context.workflow_type,
+            "status": context.status.value,
+            "created_at": context.created_at
+        }
+        line = dumps(summary, indent=False) + b"\n"
+        with open(index_file, "a+b") as f:
+            # 上次追加被中断时文件末尾会留下没有换行的残行，先补换行，
+            # 否则新记录会与残行粘成一行而无法解析
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
     
     @classmethod
-    def list_workflows(cls) -> list[dict]:
-        """列出所有工作流"""
+    def _scan_workflows(cls) -> list[dict]:
+        """扫描目录，逐个解析 state.json 得到工作流摘要"""
         workflows = []
         if cls.WORKFLOW_ROOT.exists():
             for workflow_dir in cls.WORKFLOW_ROOT.iterdir():
                 if workflow_dir.is_dir():
                     state_file = workflow_dir / "state.json"
                     if state_file.exists():
-                        data = json.loads(state_file.read_text(encoding="utf-8"))
+                        data = loads(state_file.read_bytes())
                         workflows.append({
                             "workflow_id": data["workflow_id"],
                             "type": data["workflow_type"],
@@ -390,4 +527,61 @@ class WorkflowState:
                             "created_at": data["created_at"]
                         })
         return workflows
+    
+    @classmethod
+    def _rebuild_index(cls) -> list[dict]:
+        """通过一次目录扫描重建索引文件"""
+        workflows = cls._scan_workflows()
+        if cls.WORKFLOW_ROOT.exists():
+            index_file = cls.WORKFLOW_ROOT / cls.INDEX_FILENAME
+            cls._index_cache.pop(str(index_file), None)
+            _atomic_write_bytes(index_file, b"".join(dumps(w, indent=False) + b"\n" for w in workflows))
+        return workflows
+    
+    @classmethod
+    def list_workflows(cls) -> list[dict]:
+        """
+        列出所有工作流
+        
+        从索引文件读取摘要，不再逐个解析 state.json；索引不存在时扫描一次并重建。
+        解析结果缓存在进程内，之后每次只读取和解析上次之后追加的记录。
+        """
+        if not cls.WORKFLOW_ROOT.exists():
+            return []
+        
+        index_file = cls.WORKFLOW_ROOT / cls.INDEX_FILENAME
+        cache_key = str(index_file)
+        cached = cls._index_cache.get(cache_key)
+        try:
+            with open(index_file, "rb") as f:
+                st = os.fstat(f.fileno())
+                if cached is not None and cached[0] == st.st_ino and cached[1] <= st.st_size:
+                    _, offset, latest = cached
+                    f.seek(offset)
+                else:
+                    offset, latest = 0, {}
+                data = f.read()
+        except FileNotFoundError:
+            cls._index_cache.pop(cache_key, None)
+            return cls._rebuild_index()
+        
+        # 只解析完整的行，末尾可能正在写入的半行留到下次
+        end = data.rfind(b"\n") + 1
+        
+        # 同一工作流以最后一条记录为准
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = loads(line)
+            except ValueError:  # 写入中断留下的残行
+                continue
+            latest[record["workflow_id"]] = record
+        cls._index_cache[cache_key] = (st.st_ino, offset + end, latest)
+        
+        # 过滤掉已被删除的工作流
+        return [
+            w for w in latest.values()
+            if (cls.WORKFLOW_ROOT / w["workflow_id"] / "state.json").exists()
+        ]
 
@@ -5,11 +5,30 @@
 """
 
 import re
-from pathlib import Path
+from operator import itemgetter
 from ..core.components import HTMLComponents, TimelineEvent
 from .base import BaseStep
 
 
+# input_focus 日志中的 "包名/Activity"，如 input_focus: com.example.app/.MainActivity
+_FOCUS_RE = re.compile(r'input_focus[:\s]+(\S+)/(\S+)')
+
+# 日志行中的包名
+_PKG_RE = re.compile(r'([a-z][a-z0-9_]*(?:\.[a-z0-9_]+)+)', re.IGNORECASE)
+
+# 旧版本保存的日志为纯文本行，从中提取 "HH:MM:SS.ffffff" 时间
+_TIME_RE = re.compile(r'(\d{2}:\d{2}:\d{2}\.\d+)')
+
+
+def _with_times(logs: list[str]) -> list[tuple[str, str]]:
+    """为纯文本日志行补上时间，没有时间的行时间为空字符串"""
+    pairs = []
+    for log in logs:
+        time_match = _TIME_RE.search(log)
+        pairs.append((time_match.group(1) if time_match else "", log))
+    return pairs
+
+
 class AnalyzeTimelineStep(BaseStep):
     """分析时间线步骤"""
     
@@ -17,33 +36,30 @@ class AnalyzeTimelineStep(BaseStep):
     
     async def execute(self) -> dict:
         """执行时间线分析"""
-        file_logs_map = self.get_input("file_logs_map", {})
-        
-        # 收集所有日志行并按时间排序
-        all_logs = []
-        for file_path, logs in file_logs_map.items():
-            for log in logs:
-                time_match = re.search(r'(\d{2}:\d{2}:\d{2}\.\d+)', log)
-                if time_match:
-                    all_logs.append({
-                        "time": time_match.group(1),
-                        "content": log.strip(),
-                        "file": Path(file_path).name
-                    })
+        file_logs_map = self._load_file_logs_map()
+        
+        # 收集所有日志行并按时间排序，每行只存 (时间, 内容) 元组，避免逐行创建字典
+        # 时间已在提取步骤中解析，这里直接复用，不再逐行匹配正则
+        all_logs: list[tuple[str, str]] = [
+            (log_time, log.strip())
+            for logs in file_logs_map.values()
+            for log_time, log in logs
+            if log_time
+        ]
         
-        # 按时间排序
-        all_logs.sort(key=lambda x: x["time"])
+        # 按时间排序（稳定排序，同一时间保持原有顺序）
+        all_logs.sort(key=itemgetter(0))
         
         # 解析 input_focus 事件
         timeline_events = []
         activity_flow = []
         seen_activities = set()
         
-        for log in all_logs:
-            event = self._parse_input_focus(log["content"])
+        for log_time, content in all_logs:
+            event = self._parse_input_focus(content)
             if event:
                 timeline_events.append({
-                    "time": log["time"],
+                    "time": log_time,
                     "title": event.get("title", "焦点切换"),
                     "description": event.get("description", ""),
                     "package": event.get("package", ""),
@@ -55,7 +71,7 @@ class AnalyzeTimelineStep(BaseStep):
                 if activity_key not in seen_activities and event.get("activity"):
                     seen_activities.add(activity_key)
                     activity_flow.append({
-                        "time": log["time"],
+                        "time": log_time,
                         "package": event.get("package", ""),
                         "activity": event.get("activity", "")
                     })
@@ -66,13 +82,38 @@ class AnalyzeTimelineStep(BaseStep):
             "events_count": len(timeline_events)
         }
     
+    def validate_inputs(self) -> tuple[bool, str]:
+        """验证输入数据，旧版本工作流的 global_data 中只有内联的 file_logs_map"""
+        if self.get_input("file_logs_map_path") is None and self.get_input("file_logs_map") is not None:
+            return True, ""
+        return super().validate_inputs()
+    
+    def _load_file_logs_map(self) -> dict[str, list]:
+        """
+        读取提取步骤的输出，统一为 {文件路径: [(时间, 日志行), ...]}
+        
+        旧版本的 state.json 把 file_logs_map 直接保存在 global_data 中，日志为纯文本行；
+        恢复这类工作流时从中读取，并像旧版本一样从每行中提取时间。
+        """
+        file_logs_map_path = self.get_input("file_logs_map_path")
+        if file_logs_map_path:
+            file_logs_map = self.state.load_large_output(file_logs_map_path, {})
+        else:
+            file_logs_map = self.get_input("file_logs_map", {})
+        
+        # 生成新的字典，不修改上下文缓存中的 global_data
+        return {
+            file_path: _with_times(logs) if logs and isinstance(logs[0], str) else logs
+            for file_path, logs in file_logs_map.items()
+        }
+    
     def _parse_input_focus(self, log_line: str) -> dict:
         """解析 input_focus 日志行"""
         result = {}
         
         # 尝试提取包名和 Activity
         # 常见格式: input_focus: com.example.app/.MainActivity
-        focus_match = re.search(r'input_focus[:\s]+(\S+)/(\S+)', log_line)
+        focus_match = _FOCUS_RE.search(log_line)
         if focus_match:
             result["package"] = focus_match.group(1)
             result["activity"] = focus_match.group(2)
@@ -80,7 +121,7 @@ class AnalyzeTimelineStep(BaseStep):
             result["description"] = f"包名: {result['package']}"
         else:
             # 尝试其他格式
-            pkg_match = re.search(r'([a-z][a-z0-9_]*(?:\.[a-z0-9_]+)+)', log_line, re.IGNORECASE)
+            pkg_match = _PKG_RE.search(log_line)
             if pkg_match:
                 result["package"] = pkg_match.group(1)
                 result["title"] = f"焦点变化"
@@ -21,6 +21,9 @@ class BaseStep(ABC):
     # 子类需要定义步骤名称
     step_name: str = ""
     
+    # HTML 组件生成器，方法均为静态方法、没有实例状态，所有步骤共享同一个实例
+    components = HTMLComponents()
+    
     def __init__(self, workflow_id: str):
         """
         初始化步骤
@@ -30,7 +33,6 @@ class BaseStep(ABC):
         """
         self.workflow_id = workflow_id
         self.state = WorkflowState(workflow_id)
-        self.components = HTMLComponents()
         
         # 获取步骤定义
         self.definition: Optional[StepDefinition] = registry.get_step(self.step_name)
@@ -135,8 +137,8 @@ class BaseStep(ABC):
             return f"❌ 输入验证失败: {error}"
         
         try:
-            # 标记开始
-            self.state.start_step(self.step_name)
+            # 标记开始（只更新内存，完成或失败时统一写入状态文件）
+            self.state.start_step(self.step_name, save=False)
             
             # 执行步骤
             output_data = await self.execute()
@@ -167,35 +169,35 @@ class BaseStep(ABC):
         
         step_display = self.definition.display_name if self.definition else self.step_name
         
-        result = f"""
+        parts = [f"""
 ✅ **{step_display}** 完成
 
 ## 输出数据
-"""
+"""]
         # 添加关键输出信息
         for key, value in output_data.items():
             if isinstance(value, (list, dict)):
                 if isinstance(value, list):
-                    result += f"- `{key}`: {len(value)} 项\n"
+                    parts.append(f"- `{key}`: {len(value)} 项\n")
                 else:
-                    result += f"- `{key}`: {len(value)} 字段\n"
+                    parts.append(f"- `{key}`: {len(value)} 字段\n")
             else:
-                result += f"- `{key}`: {value}\n"
+                parts.append(f"- `{key}`: {value}\n")
         
-        result += "\n---\n\n"
+        parts.append("\n---\n\n")
         
         # 添加下一步指引
         if next_info.get("completed"):
-            result += "🎉 **工作流已完成！**\n"
+            parts.append("🎉 **工作流已完成！**\n")
             if next_info.get("output_path"):
-                result += f"\n📄 报告已生成: `{next_info['output_path']}`"
+                parts.append(f"\n📄 报告已生成: `{next_info['output_path']}`")
         else:
             current_step = next_info.get("current_step", "")
             progress = next_info.get("progress", "")
             step_def = registry.get_step(current_step)
             
             if step_def:
-                result += f"""
+                parts.append(f"""
 ## 📍 下一步 ({progress})
 
 **{step_def.display_name}**
@@ -206,7 +208,7 @@ class BaseStep(ABC):
 ```
 workflow_id: "{self.workflow_id}"
 ```
-"""
+""")
         
-        return result
+        return "".join(parts)
 
@@ -4,18 +4,34 @@
 从各个 events 文件中提取 input_focus 关键字的日志
 """
 
+import asyncio
+import os
 import re
 from datetime import datetime, timedelta
-from pathlib import Path
+from typing import Optional
+from common.filter_logs import parse_log_time
 from ..core.components import HTMLComponents
 from .base import BaseStep
 
 
+# 逐行读取日志时使用的缓冲区大小（1 MiB），减少大文件的 read() 调用次数
+READ_BUFFER_SIZE = 1 << 20
+
+# 日志行中的 "MM-DD HH:MM:SS.ffffff" 时间戳，分组与 common.filter_logs 一致，由 parse_log_time 构造 datetime
+_FULL_TIME_RE = re.compile(r'(\d{2})-(\d{2})\s+(\d{2}):(\d{2}):(\d{2})\.(\d+)')
+
+# 没有完整时间戳的日志行中的 "HH:MM:SS.ffffff" 时间
+_TIME_RE = re.compile(r'(\d{2}:\d{2}:\d{2}\.\d+)')
+
+
 class ExtractLogsStep(BaseStep):
     """提取日志步骤"""
     
     step_name = "extract_logs"
     
+    # execute 中提取的日志，供 generate_html 直接使用，无需重新读取
+    _file_logs_map: Optional[dict] = None
+    
     async def execute(self) -> dict:
         """执行日志提取"""
         events_files = self.get_input("events_files", [])
@@ -30,16 +46,24 @@ class ExtractLogsStep(BaseStep):
         file_logs_map = {}
         total_logs = 0
         
-        for file_info in events_files:
-            file_path = file_info["path"]
-            logs = self._filter_logs(file_path, "input_focus", start_time, end_time)
-            
+        # 各文件相互独立，放到线程中并发过滤，重叠文件读取的等待时间
+        file_paths = [file_info["path"] for file_info in events_files]
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self._filter_logs, file_path, "input_focus", start_time, end_time)
+            for file_path in file_paths
+        ))
+        
+        for file_path, logs in zip(file_paths, results):
             if logs:
                 file_logs_map[file_path] = logs
                 total_logs += len(logs)
         
+        # 日志内容单独存盘，global_data 中只保留路径，保持 state.json 小巧
+        self._file_logs_map = file_logs_map
+        file_logs_map_path = self.state.put_large_output("file_logs_map", file_logs_map)
+        
         return {
-            "file_logs_map": file_logs_map,
+            "file_logs_map_path": file_logs_map_path,
             "total_logs": total_logs,
             "files_with_logs": len(file_logs_map)
         }
@@ -60,32 +84,49 @@ class ExtractLogsStep(BaseStep):
         keyword: str,
         start_time: datetime,
         end_time: datetime
-    ) -> list[str]:
-        """过滤日志"""
+    ) -> list[tuple[str, str]]:
+        """
+        过滤日志
+        
+        Returns:
+            (时间, 日志行) 列表，时间为 "HH:MM:SS.ffffff"，无法识别时为空字符串。
+            时间在过滤时顺带解析，后续时间线分析直接复用，不再重复匹配。
+        """
         filtered_logs = []
+        # 日志中没有年份，按当前年份补全；循环外取一次即可
+        year = datetime.now().year
+        
+        keyword_bytes = keyword.encode('utf-8')
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
+            # 以二进制方式读取，先按字节做关键字过滤，只有命中的行才解码
+            with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+                for raw_line in f:
                     # 关键字过滤
-                    if keyword not in line:
+                    if keyword_bytes not in raw_line:
                         continue
                     
+                    line = raw_line.decode('utf-8', errors='replace')
+                    if line.endswith('\r\n'):
+                        # 与文本模式的换行处理保持一致
+                        line = line[:-2] + '\n'
+                    
                     # 时间过滤
-                    time_match = re.search(r'(\d{2}-\d{2}\s+)(\d{2}:\d{2}:\d{2}\.\d+)', line)
+                    time_match = _FULL_TIME_RE.search(line)
                     if time_match:
                         try:
-                            time_str = time_match.group(0)
-                            log_time = datetime.strptime(time_str, '%m-%d %H:%M:%S.%f')
-                            log_time = log_time.replace(year=datetime.now().year)
+                            # 非法日期抛出 ValueError
+                            log_time = parse_log_time(time_match, year)
                             
                             if start_time <= log_time <= end_time:
-                                filtered_logs.append(line)
+                                _, _, hour, minute, second, frac = time_match.groups()
+                                filtered_logs.append((f"{hour}:{minute}:{second}.{frac}", line))
                         except ValueError:
                             continue
                     else:
                         # 没有时间戳但包含关键字，也保留
-                        filtered_logs.append(line)
+                        short_match = _TIME_RE.search(line)
+                        filtered_logs.append((short_match.group(1) if short_match else "", line))
         except Exception:
             pass
         
@@ -93,7 +134,9 @@ class ExtractLogsStep(BaseStep):
     
     def generate_html(self, output_data: dict) -> str:
         """生成日志块 HTML"""
-        file_logs_map = output_data["file_logs_map"]
+        file_logs_map = self._file_logs_map
+        if file_logs_map is None:
+            file_logs_map = self.state.load_large_output(output_data["file_logs_map_path"], {})
         
         if not file_logs_map:
             return HTMLComponents.conclusion_box(
@@ -102,17 +145,18 @@ class ExtractLogsStep(BaseStep):
                 box_type="warning"
             )
         
-        logs_html = ""
+        log_blocks = []
         for file_path, logs in file_logs_map.items():
-            filename = Path(file_path).name
-            content = "".join(logs[:200])  # 限制显示行数
+            filename = os.path.basename(file_path)
+            content = "".join(line for _, line in logs[:200])  # 限制显示行数
             
-            logs_html += HTMLComponents.log_block(
+            log_blocks.append(HTMLComponents.log_block(
                 filename=filename,
                 content=content,
                 line_count=len(logs),
                 max_lines=200
-            )
+            ))
+        logs_html = "".join(log_blocks)
         
         return HTMLComponents.section(
             title="原始日志",
@@ -27,17 +27,15 @@ class FinalizeReportStep(BaseStep):
         # 创建报告构建器
         builder = ReportBuilder(f"场景分析报告 - {timestamp}")
         
-        # 加载所有 HTML 片段
+        # 所有 HTML 片段
         fragments = self.state.get_all_fragments()
-        for fragment_path in fragments:
-            builder.add_fragment_from_file(fragment_path)
         
         # 生成输出路径
         safe_timestamp = timestamp.replace(":", "-").replace(" ", "_").replace(".", "-")
         output_path = f"logs/workflows/{self.workflow_id}/report.html"
         
-        # 构建报告
-        absolute_path = builder.build(output_path)
+        # 构建报告（片段文件直接流式拷贝到报告中，不整体读入内存）
+        absolute_path = builder.build_streaming(output_path, fragments)
         
         # 更新状态
         self.state.set_output_path(absolute_path)
@@ -57,7 +55,7 @@ class FinalizeReportStep(BaseStep):
             return f"❌ 工作流 {self.workflow_id} 不存在"
         
         try:
-            self.state.start_step(self.step_name)
+            self.state.start_step(self.step_name, save=False)
             
             output_data = await self.execute()
             
@@ -7,13 +7,17 @@
 """
 
 from datetime import datetime
-from pathlib import Path
+import os
 from ..core.state import WorkflowState
 from ..core.components import HTMLComponents, StatCard
 from ..core.registry import registry
 from .base import BaseStep
 
 
+# 时间戳转为工作流 ID 时的字符替换表，一次 translate 完成全部替换
+_SAFE_TIMESTAMP_TABLE = str.maketrans({":": "", " ": "_", ".": ""})
+
+
 class InitWorkflowStep(BaseStep):
     """初始化工作流步骤"""
     
@@ -34,7 +38,7 @@ class InitWorkflowStep(BaseStep):
             time_window: 时间窗口
         """
         # 生成工作流 ID
-        safe_timestamp = timestamp.replace(":", "").replace(" ", "_").replace(".", "")
+        safe_timestamp = timestamp.translate(_SAFE_TIMESTAMP_TABLE)
         workflow_id = f"scene_{safe_timestamp}_{datetime.now().strftime('%H%M%S')}"
         
         super().__init__(workflow_id)
@@ -91,7 +95,7 @@ class InitWorkflowStep(BaseStep):
             html_fragment = self.generate_html(output_data)
             
             # 保存 HTML 片段（手动调用，因为状态刚创建）
-            self.state.start_step(self.step_name)
+            self.state.start_step(self.step_name, save=False)
             self.state.complete_step(
                 self.step_name,
                 output_data=output_data,
@@ -124,7 +128,7 @@ async def init_scene_workflow(
         执行结果和下一步指引
     """
     # 验证路径存在
-    if not Path(log_path).exists():
+    if not os.path.exists(log_path):
         return f"❌ 路径不存在: {log_path}"
     
     step = InitWorkflowStep(log_path, timestamp, time_window)
@@ -4,12 +4,65 @@
 负责在日志目录中搜索包含 'events' 的日志文件
 """
 
+import asyncio
 import os
-from pathlib import Path
+import stat
+from typing import Optional
+from common.scan_events import EVENTS_TOKEN, entry_size, file_sizes, path_size, scan_events_tree
 from ..core.components import HTMLComponents, StatCard
 from .base import BaseStep
 
 
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """获取路径的 stat 信息，路径不存在或无效时返回 None"""
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+# 目录扫描结果缓存：根目录绝对路径 -> (各目录 mtime, 匹配到的文件路径和文件名)
+# 目录中条目的增删改名会更新所在目录的 mtime，各目录 mtime 不变时通常可以认为文件列表不变，
+# 命中时只需 stat 目录和匹配到的文件，不再遍历目录中的其他文件。
+# 注意：FAT/exFAT（2 秒）、部分 SMB 挂载等文件系统的 mtime 精度较粗，
+# 同一精度区间内的连续变化无法发现，这类场景下缓存结果可能短暂滞后
+_scan_cache: dict[str, tuple[dict[str, int], list[tuple[str, str]]]] = {}
+
+# 缓存的根目录数量上限，超出时淘汰最早加入的
+_SCAN_CACHE_MAX = 8
+
+
+def _load_cached_scan(root: str) -> Optional[list[tuple[str, str]]]:
+    """
+    从缓存中取回目录扫描结果（文件路径和文件名）
+    
+    任一目录的 mtime 发生变化（或目录已不存在）时视为未命中；
+    文件大小随日志写入而变化，不做缓存，由调用方重新获取。
+    """
+    cached = _scan_cache.get(root)
+    if cached is None:
+        return None
+    
+    dir_mtimes, files = cached
+    try:
+        for dir_path, mtime in dir_mtimes.items():
+            if os.stat(dir_path).st_mtime_ns != mtime:
+                return None
+    except OSError:
+        return None
+    return files
+
+
+def _store_scan(root: str, dir_mtimes: dict[str, Optional[int]], files: list[tuple[str, str]]):
+    """记录目录扫描结果，有目录读取失败时结果不完整，不做缓存"""
+    _scan_cache.pop(root, None)
+    if None in dir_mtimes.values():
+        return
+    if len(_scan_cache) >= _SCAN_CACHE_MAX:
+        del _scan_cache[next(iter(_scan_cache))]
+    _scan_cache[root] = (dir_mtimes, files)
+
+
 class SearchFilesStep(BaseStep):
     """搜索文件步骤"""
     
@@ -18,34 +71,48 @@ class SearchFilesStep(BaseStep):
     async def execute(self) -> dict:
         """执行搜索"""
         log_path = self.get_param("log_path")
-        log_path_obj = Path(log_path)
         
         events_files = []
+        total_size = 0
+        
+        # 一次 stat 同时得到路径类型和文件大小；网络盘上 stat 也可能阻塞，同样放到线程中执行
+        path_stat = await asyncio.to_thread(_stat_or_none, log_path)
         
-        if log_path_obj.is_file():
+        if path_stat is not None and stat.S_ISREG(path_stat.st_mode):
             # 如果是单个文件，检查文件名是否包含 events
-            if 'events' in log_path_obj.name.lower():
+            name = os.path.basename(log_path)
+            if EVENTS_TOKEN in name.lower():
                 events_files.append({
-                    "path": str(log_path_obj.absolute()),
-                    "name": log_path_obj.name,
-                    "size": log_path_obj.stat().st_size
+                    "path": os.path.abspath(log_path),
+                    "name": name,
+                    "size": path_stat.st_size
                 })
-        elif log_path_obj.is_dir():
-            # 如果是目录，递归搜索
-            for root, dirs, files in os.walk(log_path):
-                for file in files:
-                    if 'events' in file.lower():
-                        file_path = Path(root) / file
-                        events_files.append({
-                            "path": str(file_path.absolute()),
-                            "name": file,
-                            "size": file_path.stat().st_size
-                        })
+                total_size = path_stat.st_size
+        elif path_stat is not None and stat.S_ISDIR(path_stat.st_mode):
+            # 如果是目录，递归搜索；从绝对路径开始扫描，DirEntry.path 即为绝对路径
+            root = os.path.abspath(log_path)
+            files = await asyncio.to_thread(_load_cached_scan, root)
+            if files is not None:
+                sizes = await file_sizes(path_size, [path for path, _ in files])
+            else:
+                dir_mtimes = {}
+                entries = await scan_events_tree(root, dir_mtimes)
+                # 遍历时只收集条目，再批量获取大小
+                sizes = await file_sizes(entry_size, entries)
+                files = [(entry.path, entry.name) for entry in entries]
+                _store_scan(root, dir_mtimes, files)
+            
+            events_files = [
+                {"path": path, "name": name, "size": size}
+                for (path, name), size in zip(files, sizes)
+            ]
+            # 直接对大小列表求和，不再遍历结果字典
+            total_size = sum(sizes)
         
         return {
             "events_files": events_files,
             "files_count": len(events_files),
-            "total_size": sum(f["size"] for f in events_files)
+            "total_size": total_size
         }
     
     def generate_html(self, output_data: dict) -> str:
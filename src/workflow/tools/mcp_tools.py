@@ -4,12 +4,36 @@ MCP 工具注册
 将工作流步骤注册为 MCP 工具，供 AI agent 调用
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from mcp.server.fastmcp import FastMCP
 
 
+# 步骤状态对应的图标
+_STEP_STATUS_ICONS = {
+    "pending": "⏳",
+    "running": "🔄",
+    "completed": "✅",
+    "failed": "❌",
+    "skipped": "⏭️"
+}
+
+# 工作流状态对应的图标
+_WORKFLOW_STATUS_ICONS = {
+    "pending": "⏳",
+    "running": "🔄",
+    "completed": "✅",
+    "failed": "❌"
+}
+
+
+def _step_status_icon(result: Optional[dict]) -> str:
+    """步骤执行记录对应的图标，没有执行记录的步骤视为 pending"""
+    status = result.get("status", "pending") if result else "pending"
+    return _STEP_STATUS_ICONS.get(status, "❓")
+
+
 def register_workflow_tools(mcp: "FastMCP"):
     """
     注册所有工作流相关的 MCP 工具
@@ -17,6 +41,14 @@ def register_workflow_tools(mcp: "FastMCP"):
     Args:
         mcp: FastMCP 实例
     """
+    # 步骤实现在注册时统一导入一次，工具调用时直接使用，避免每次调用都走导入机制
+    from ..steps.init_workflow import init_scene_workflow as _init
+    from ..steps.search_files import search_events as _search
+    from ..steps.extract_logs import extract_logs as _extract
+    from ..steps.analyze_timeline import analyze_timeline as _analyze
+    from ..steps.finalize_report import finalize_report as _finalize
+    from ..core.state import WorkflowState
+    from ..core.components import HTMLComponents
     
     # ==================== 步骤 1: 初始化工作流 ====================
     
@@ -41,7 +73,6 @@ def register_workflow_tools(mcp: "FastMCP"):
         Returns:
             执行结果和下一步指引（包含 workflow_id）
         """
-        from ..steps.init_workflow import init_scene_workflow as _init
         return await _init(log_path, timestamp, time_window)
     
     # ==================== 步骤 2: 搜索文件 ====================
@@ -61,7 +92,6 @@ def register_workflow_tools(mcp: "FastMCP"):
         Returns:
             执行结果和下一步指引
         """
-        from ..steps.search_files import search_events as _search
         return await _search(workflow_id)
     
     # ==================== 步骤 3: 提取日志 ====================
@@ -81,7 +111,6 @@ def register_workflow_tools(mcp: "FastMCP"):
         Returns:
             执行结果和下一步指引
         """
-        from ..steps.extract_logs import extract_logs as _extract
         return await _extract(workflow_id)
     
     # ==================== 步骤 4: 分析时间线 ====================
@@ -101,7 +130,6 @@ def register_workflow_tools(mcp: "FastMCP"):
         Returns:
             执行结果和下一步指引
         """
-        from ..steps.analyze_timeline import analyze_timeline as _analyze
         return await _analyze(workflow_id)
     
     # ==================== 步骤 5: 生成分析（AI 分析） ====================
@@ -128,16 +156,13 @@ def register_workflow_tools(mcp: "FastMCP"):
         Returns:
             执行结果和下一步指引
         """
-        from ..core.state import WorkflowState
-        from ..core.components import HTMLComponents
-        
         state = WorkflowState(workflow_id)
         
         if not state.exists():
             return f"❌ 工作流 {workflow_id} 不存在"
         
         try:
-            state.start_step("generate_analysis")
+            state.start_step("generate_analysis", save=False)
             
             # 包装分析内容
             html_fragment = HTMLComponents.section(
@@ -193,7 +218,6 @@ workflow_id: "{workflow_id}"
         Returns:
             报告文件路径
         """
-        from ..steps.finalize_report import finalize_report as _finalize
         return await _finalize(workflow_id)
     
     # ==================== 辅助工具 ====================
@@ -211,8 +235,6 @@ workflow_id: "{workflow_id}"
         Returns:
             工作流状态信息
         """
-        from ..core.state import WorkflowState
-        
         state = WorkflowState(workflow_id)
         
         if not state.exists():
@@ -225,18 +247,10 @@ workflow_id: "{workflow_id}"
         next_info = state.get_next_step_info()
         
         # 构建步骤状态列表
-        steps_status = []
-        for step_name in context.steps:
-            result = context.step_results.get(step_name, {})
-            status = result.get("status", "pending")
-            status_icon = {
-                "pending": "⏳",
-                "running": "🔄",
-                "completed": "✅",
-                "failed": "❌",
-                "skipped": "⏭️"
-            }.get(status, "❓")
-            steps_status.append(f"{status_icon} {step_name}")
+        steps_status = "\n".join(
+            f"{_step_status_icon(context.step_results.get(step_name))} {step_name}"
+            for step_name in context.steps
+        )
         
         return f"""
 ## 工作流状态
@@ -252,7 +266,7 @@ workflow_id: "{workflow_id}"
 - 时间窗口: {context.params.get('time_window', '')}秒
 
 ### 步骤进度
-{chr(10).join(steps_status)}
+{steps_status}
 
 ### 下一步
 {next_info.get('message', '') if next_info.get('completed') or next_info.get('failed') else f"调用 `{next_info.get('current_step', '')}` 工具"}
@@ -268,8 +282,6 @@ workflow_id: "{workflow_id}"
         Returns:
             工作流列表
         """
-        from ..core.state import WorkflowState
-        
         workflows = WorkflowState.list_workflows()
         
         if not workflows:
@@ -277,13 +289,7 @@ workflow_id: "{workflow_id}"
         
         lines = ["## 工作流列表", ""]
         for wf in workflows:
-            status_icon = {
-                "pending": "⏳",
-                "running": "🔄",
-                "completed": "✅",
-                "failed": "❌"
-            }.get(wf["status"], "❓")
-            
+            status_icon = _WORKFLOW_STATUS_ICONS.get(wf["status"], "❓")
             lines.append(f"- {status_icon} `{wf['workflow_id']}` ({wf['type']}) - {wf['created_at']}")
         
         return "\n".join(lines)